@@ -0,0 +1,203 @@
+"""
+Bounded pool of database connections, shared by the threads of a process.
+
+`PooledDatabaseWrapperMixin` makes a Django backend check its connections
+out of a `ConnectionPool` instead of opening them, and give them back instead
+of closing them. With CONN_MAX_AGE a thread still keeps its connection across
+requests, the pool bounds how many are open, closes the ones idle for longer
+than `idle_timeout` and health checks every connection it hands out again.
+"""
+import json
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+DEFAULTS = {
+    "MAX_SIZE": 10,
+    "IDLE_TIMEOUT": 300,
+    "CHECKOUT_TIMEOUT": 5,
+}
+
+# (alias, connection parameters) -> pool, tests switch the parameters of an alias to the test database
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+def close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    def __init__(self, max_size, idle_timeout, checkout_timeout, is_healthy, reset):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.is_healthy = is_healthy
+        self.reset = reset
+        # (connection, returned at), the most recently returned last
+        self._idle = deque()
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self.closed = False
+        self.reset_stats()
+
+    def checkout(self, connect):
+        """A pooled connection that passed the health check, or a new one from `connect()`."""
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._condition:
+            self.counters["checkouts"] += 1
+            while True:
+                self._expire_idle()
+                if self._idle:
+                    # Last in, first out: the oldest connections stay idle and expire
+                    raw, _ = self._idle.pop()
+                    break
+                if self._in_use + len(self._idle) < self.max_size:
+                    raw = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters["timeouts"] += 1
+                    raise PoolTimeout(f"No database connection available within {self.checkout_timeout}s")
+                self.counters["waits"] += 1
+                waited = time.monotonic()
+                self._condition.wait(remaining)
+                self.counters["wait_seconds"] += time.monotonic() - waited
+            self._in_use += 1
+
+        if raw is not None:
+            if self.is_healthy(raw):
+                self._count("reused")
+                return raw
+            self._count("unhealthy")
+            close_quietly(raw)
+        started = time.perf_counter()
+        try:
+            raw = connect()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self.counters["created"] += 1
+            self.counters["connect_seconds"] += time.perf_counter() - started
+        return raw
+
+    def checkin(self, raw):
+        healthy = self.reset(raw)
+        with self._condition:
+            self._in_use -= 1
+            healthy = healthy and not self.closed
+            if healthy:
+                self._idle.append((raw, time.monotonic()))
+            elif not self.closed:
+                self.counters["unhealthy"] += 1
+            self._expire_idle()
+            self._condition.notify()
+        if not healthy:
+            close_quietly(raw)
+
+    def close(self):
+        """Close the idle connections, the ones in use are closed when given back."""
+        with self._condition:
+            self.closed = True
+            idle, self._idle = self._idle, deque()
+        for raw, _ in idle:
+            close_quietly(raw)
+
+    def _expire_idle(self):
+        now = time.monotonic()
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            raw, _ = self._idle.popleft()
+            self.counters["expired"] += 1
+            close_quietly(raw)
+
+    def _count(self, name):
+        with self._condition:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._condition:
+            return dict(self.counters, in_use=self._in_use, idle=len(self._idle), max_size=self.max_size)
+
+    def reset_stats(self):
+        self.counters = dict.fromkeys(
+            ("checkouts", "reused", "created", "unhealthy", "expired", "waits", "timeouts"), 0
+        )
+        self.counters.update(wait_seconds=0.0, connect_seconds=0.0)
+
+
+class PooledDatabaseWrapperMixin:
+    """DatabaseWrapper mixin, pool options come from the POOL dict of the database settings."""
+
+    @staticmethod
+    def pool_is_healthy(raw):
+        try:
+            cursor = raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def pool_reset(raw):
+        # Nothing a request left uncommitted may leak into the next one
+        try:
+            raw.rollback()
+            return True
+        except Exception:
+            return False
+
+    def get_pool(self, conn_params):
+        key = (self.alias, json.dumps(conn_params, sort_keys=True, default=str))
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = dict(DEFAULTS, **self.settings_dict.get("POOL", {}))
+                pool = _pools[key] = ConnectionPool(
+                    max_size=options["MAX_SIZE"],
+                    idle_timeout=options["IDLE_TIMEOUT"],
+                    checkout_timeout=options["CHECKOUT_TIMEOUT"],
+                    is_healthy=self.pool_is_healthy,
+                    reset=self.pool_reset,
+                )
+        return pool
+
+    def get_new_connection(self, conn_params):
+        self._pool = self.get_pool(conn_params)
+        return self._pool.checkout(lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            self._pool.checkin(self.connection)
+
+
+def pooled(wrapper_class):
+    """`wrapper_class` with its connections pooled, e.g. for backends without a pooled engine."""
+    return type(f"Pooled{wrapper_class.__name__}", (PooledDatabaseWrapperMixin, wrapper_class), {})
+
+
+def stats():
+    with _pools_lock:
+        pools = list(_pools.items())
+    return [dict(pool.stats(), alias=alias) for (alias, _), pool in pools]
+
+
+def close_pools(alias=None):
+    """Close the idle connections of the pools of `alias`, or all of them, and forget these pools."""
+    with _pools_lock:
+        keys = [key for key in _pools if alias is None or key[0] == alias]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,43 @@
+from django.db.backends.postgresql import base, creation
+from psycopg2 import extensions
+
+from backend_app_32996.db.pool import PooledDatabaseWrapperMixin, close_pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections to the test database would make DROP DATABASE fail
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """PostgreSQL backend checking its connections out of a bounded, per-process pool."""
+
+    creation_class = DatabaseCreation
+
+    @staticmethod
+    def pool_is_healthy(raw):
+        if raw.closed:
+            return False
+        return PooledDatabaseWrapperMixin.pool_is_healthy(raw)
+
+    @staticmethod
+    def pool_reset(raw):
+        status = raw.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            # The server connection is gone
+            return False
+        if status == extensions.TRANSACTION_STATUS_IDLE:
+            return True
+        return PooledDatabaseWrapperMixin.pool_reset(raw)
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        if not hasattr(self, "isolation_level"):
+            # Set by the parent class when it opens a connection, not when the pool hands out an open one,
+            # which is in autocommit and no longer tells the server default
+            self.isolation_level = self.settings_dict["OPTIONS"].get(
+                "isolation_level", extensions.ISOLATION_LEVEL_READ_COMMITTED
+            )
+        return connection
@@ -0,0 +1,199 @@
+"""
+Read replicas for GET traffic, with read-your-writes stickiness.
+
+`ReplicaRouter` sends reads to the DATABASE_REPLICAS aliases, round robin,
+and everything else to the primary. Reads stay on the primary when:
+
+- the request is not a GET, HEAD or OPTIONS,
+- the request already wrote, or is in a transaction on the primary,
+- the client (same Authorization header or session cookie) wrote in the last
+  DATABASE_REPLICA_PIN_SECONDS, which `ReplicaPinningMiddleware` remembers in
+  the cache. Never less than DATABASE_REPLICA_MAX_LAG, or the client could
+  read a replica that is fresh enough but doesn't have its write yet,
+- no replica is within DATABASE_REPLICA_MAX_LAG seconds of the primary. The lag
+  of a replica is measured at most every DATABASE_REPLICA_LAG_CHECK_INTERVAL
+  seconds, an unreachable replica counts as lagging.
+
+Caches shared between requests fill from the replicas too, but don't store what
+they read while `may_be_stale()` says a replica can still miss the last change.
+"""
+import contextvars
+import hashlib
+import itertools
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Lag of the last transaction replayed, 0 when the replica has replayed everything it received
+POSTGRESQL_LAG = """
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END
+"""
+
+_state = contextvars.ContextVar("replica_routing", default=None)
+_lock = threading.Lock()
+_counters = defaultdict(lambda: {"reads": 0, "writes": 0})
+_fallbacks = {"pinned": 0, "lagging": 0}
+# alias -> (checked at, lag in seconds or None when unreachable)
+_lag = {}
+_round_robin = itertools.count()
+
+
+class RoutingState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replication_lag(alias):
+    connection = connections[alias]
+    try:
+        connection.ensure_connection()
+        if connection.vendor != "postgresql":
+            # Nothing to measure, e.g. the SQLite replica of the tests
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRESQL_LAG)
+            lag = cursor.fetchone()[0]
+        return float(lag or 0)
+    except DatabaseError:
+        return None
+
+
+def is_fresh(alias):
+    now = time.monotonic()
+    checked = _lag.get(alias)
+    if checked is None or now - checked[0] >= getattr(settings, "DATABASE_REPLICA_LAG_CHECK_INTERVAL", 5):
+        checked = _lag[alias] = (now, replication_lag(alias))
+    return checked[1] is not None and checked[1] <= max_lag()
+
+
+def max_lag():
+    return getattr(settings, "DATABASE_REPLICA_MAX_LAG", 10)
+
+
+def pin_seconds():
+    return max(getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", max_lag()), max_lag())
+
+
+def may_be_stale(changed_at):
+    """
+    Whether a replica read can miss a change committed at `changed_at`, a
+    `time.time()` or None when no recent change was recorded.
+    """
+    if changed_at is None or not getattr(settings, "DATABASE_REPLICAS", []):
+        return False
+    return time.time() - changed_at < max_lag()
+
+
+def count(alias, operation):
+    with _lock:
+        _counters[alias][operation] += 1
+    return alias
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        if not replicas:
+            return None
+        state = _state.get()
+        if (state is not None and (state.pinned or state.wrote)) or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            with _lock:
+                _fallbacks["pinned"] += 1
+            return count(DEFAULT_DB_ALIAS, "reads")
+        fresh = [alias for alias in replicas if is_fresh(alias)]
+        if not fresh:
+            with _lock:
+                _fallbacks["lagging"] += 1
+            return count(DEFAULT_DB_ALIAS, "reads")
+        return count(fresh[next(_round_robin) % len(fresh)], "reads")
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is None:
+            # Outside requests (commands, shell) reads stay on the primary after the first write
+            state = RoutingState()
+            _state.set(state)
+        state.wrote = True
+        return count(DEFAULT_DB_ALIAS, "writes")
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in getattr(settings, "DATABASE_REPLICAS", []):
+            return False
+        return None
+
+
+def client_key(request):
+    credentials = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credentials:
+        return None
+    return "replica-pin:" + hashlib.md5(credentials.encode()).hexdigest()
+
+
+class ReplicaPinningMiddleware:
+    """Keeps the reads of a client on the primary for a while after it wrote."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "DATABASE_REPLICAS", []):
+            return self.get_response(request)
+        key = client_key(request)
+        pinned = request.method not in SAFE_METHODS or (key is not None and cache.get(key) is not None)
+        state = RoutingState(pinned)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and key is not None:
+            cache.set(key, True, pin_seconds())
+        if response.streaming:
+            # Streamed bodies read their rows after this returned
+            response.streaming_content = routed(response.streaming_content, state)
+        return response
+
+
+def routed(chunks, state):
+    """Iterate over `chunks` with the routing `state` of the request that produced them."""
+    chunks = iter(chunks)
+    while True:
+        token = _state.set(state)
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            _state.reset(token)
+        yield chunk
+
+
+def stats():
+    now = time.monotonic()
+    with _lock:
+        return {
+            "aliases": {alias: dict(counters) for alias, counters in _counters.items()},
+            "primary_fallbacks": dict(_fallbacks),
+            "replicas": {
+                alias: {"lag_seconds": lag, "checked_seconds_ago": now - checked_at}
+                for alias, (checked_at, lag) in _lag.items()
+            },
+        }
+
+
+def reset_stats():
+    with _lock:
+        _counters.clear()
+        _fallbacks.update(pinned=0, lagging=0)
+        _lag.clear()
@@ -0,0 +1,135 @@
+"""
+Settings payload from Google Secret Manager, cached on local disk.
+
+Resolving it costs the import of the google.cloud stack, a credentials lookup
+(which probes the GCE metadata server) and an API round trip, on every process
+start. Instead the decoded payload is kept in a Fernet encrypted file: a fresh
+file is used as is, a stale one is used and refreshed in the background for the
+next start, and only a missing or unreadable one is fetched synchronously.
+The file is only used when both its path and its key are configured, otherwise
+the payload is fetched on every start. Nothing is imported or requested when
+the environment has no Google credentials at all.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Set by the serverless runtimes, GCE and GKE are recognised from the DMI data
+GCP_RUNTIME_VARIABLES = ("K_SERVICE", "GAE_APPLICATION", "GAE_ENV", "FUNCTION_TARGET")
+GCE_PRODUCT_NAME_FILE = "/sys/class/dmi/id/product_name"
+
+
+def credentials_available():
+    """
+    Cheap check for what `google.auth.default()` would find, without
+    importing google.auth or calling the metadata server.
+    """
+    if os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+        return True
+    if any(os.environ.get(name) for name in GCP_RUNTIME_VARIABLES):
+        return True
+    config_dir = os.environ.get("CLOUDSDK_CONFIG") or os.path.join(
+        os.environ.get("APPDATA", "") if os.name == "nt" else os.path.expanduser("~/.config"), "gcloud"
+    )
+    if os.path.exists(os.path.join(config_dir, "application_default_credentials.json")):
+        return True
+    try:
+        with open(GCE_PRODUCT_NAME_FILE) as f:
+            return f.read().startswith("Google")
+    except OSError:
+        return False
+
+
+def fetch_payload(settings_name, timeout):
+    """The latest version of the `settings_name` secret, None when it can't be read."""
+    import google.auth
+    from google.api_core.exceptions import GoogleAPICallError, PermissionDenied
+    from google.auth.exceptions import DefaultCredentialsError
+    from google.cloud import secretmanager
+
+    try:
+        _, project = google.auth.default()
+        client = secretmanager.SecretManagerServiceClient()
+        name = client.secret_version_path(project, settings_name, "latest")
+        return client.access_secret_version(name=name, timeout=timeout).payload.data.decode("UTF-8")
+    except (DefaultCredentialsError, PermissionDenied):
+        return None
+    except GoogleAPICallError:
+        logger.exception("Could not read the %s secret", settings_name)
+        return None
+
+
+class SecretCache:
+    """
+    Fernet encrypted file holding a payload and the time it was fetched.
+
+    `key` is a Fernet key (SECRETS_CACHE_KEY) kept apart from the file, e.g. in
+    the runtime's secret environment, the file is unreadable without it.
+    """
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+
+    def read(self):
+        """(payload, fetched_at), None when there is no readable cache."""
+        try:
+            with open(self.path, "rb") as f:
+                token = f.read()
+        except OSError:
+            return None
+        from cryptography.fernet import Fernet, InvalidToken
+
+        try:
+            entry = json.loads(Fernet(self.key).decrypt(token))
+            return entry["payload"], entry["fetched_at"]
+        except (InvalidToken, ValueError, KeyError, TypeError):
+            return None
+
+    def write(self, payload):
+        from cryptography.fernet import Fernet
+
+        token = Fernet(self.key).encrypt(json.dumps({"payload": payload, "fetched_at": time.time()}).encode())
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(token)
+            os.replace(temporary, self.path)
+        except OSError:
+            logger.warning("Could not write the secrets cache %s", self.path, exc_info=True)
+
+
+def refresh(cache, settings_name, timeout):
+    payload = fetch_payload(settings_name, timeout)
+    if payload is not None:
+        cache.write(payload)
+    return payload
+
+
+def load_payload(settings_name, cache_file, ttl, timeout, key):
+    """
+    The settings payload, from the cache file when there is one. Returns None
+    right away when no credentials are available.
+    """
+    if not credentials_available():
+        return None
+    if not cache_file or not key:
+        logger.info("SECRETS_CACHE_FILE or SECRETS_CACHE_KEY is not set, fetching the settings without a cache")
+        return fetch_payload(settings_name, timeout)
+    cache = SecretCache(cache_file, key)
+    cached = cache.read()
+    if cached is None:
+        return refresh(cache, settings_name, timeout)
+    payload, fetched_at = cached
+    if time.time() - fetched_at > ttl:
+        # Not a daemon thread, a short-lived manage.py command still finishes
+        # the refresh (bounded by the timeout) before exiting
+        threading.Thread(
+            target=refresh, args=(cache, settings_name, timeout), name="secrets-refresh"
+        ).start()
+    return payload
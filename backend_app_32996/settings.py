@@ -14,10 +14,7 @@ import os
 import io
 import environ
 import logging
-import google.auth
-from google.cloud import secretmanager
-from google.auth.exceptions import DefaultCredentialsError
-from google.api_core.exceptions import PermissionDenied
+from backend_app_32996 import secret_manager
 from modules.manifest import get_modules
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -30,16 +27,20 @@ env.read_env(env_file)
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = env.bool("DEBUG", default=False)
 
-try:
-    # Pull secrets from Secret Manager
-    _, project = google.auth.default()
-    client = secretmanager.SecretManagerServiceClient()
-    settings_name = os.environ.get("SETTINGS_NAME", "django_settings")
-    name = client.secret_version_path(project, settings_name, "latest")
-    payload = client.access_secret_version(name=name).payload.data.decode("UTF-8")
+# Pull secrets from Secret Manager, through an encrypted local cache refreshed
+# in the background once older than SECRETS_CACHE_TTL seconds. The cache needs
+# SECRETS_CACHE_FILE, a path on persistent storage private to the app, and
+# SECRETS_CACHE_KEY, a Fernet key (Fernet.generate_key()), it is off without them.
+settings_name = os.environ.get("SETTINGS_NAME", "django_settings")
+payload = secret_manager.load_payload(
+    settings_name,
+    cache_file=env.str("SECRETS_CACHE_FILE", None),
+    ttl=env.int("SECRETS_CACHE_TTL", 3600),
+    timeout=env.float("SECRETS_TIMEOUT", 5.0),
+    key=env.str("SECRETS_CACHE_KEY", None),
+)
+if payload:
     env.read_env(io.StringIO(payload))
-except (DefaultCredentialsError, PermissionDenied):
-    pass
 
 
 # Quick-start development settings - unsuitable for production
@@ -67,7 +68,7 @@ INSTALLED_APPS = [
     'django.contrib.sites'
 ]
 LOCAL_APPS = [
-    'home',
+    'home.apps.HomeConfig',
     'users.apps.UsersConfig',
 ]
 THIRD_PARTY_APPS = [
@@ -89,6 +90,8 @@ MODULES_APPS = get_modules()
 INSTALLED_APPS += LOCAL_APPS + THIRD_PARTY_APPS + MODULES_APPS
 
 MIDDLEWARE = [
+    'home.instrumentation.PerformanceMiddleware',
+    'backend_app_32996.db.router.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -134,6 +137,50 @@ if env.str("DATABASE_URL", default=None):
         'default': env.db()
     }
 
+# Read replicas, comma separated database URLs. Reads of GET requests go to them
+# unless the client wrote recently, see backend_app_32996.db.router.
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[]), 1):
+    DATABASES[f'replica_{index}'] = dict(env.db_url_config(url), TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(f'replica_{index}')
+DATABASE_ROUTERS = ['backend_app_32996.db.router.ReplicaRouter']
+DATABASE_REPLICA_MAX_LAG = env.float("DATABASE_REPLICA_MAX_LAG", 10)
+# Raised to DATABASE_REPLICA_MAX_LAG if lower, a replica that lags less still counts as fresh
+DATABASE_REPLICA_PIN_SECONDS = env.float("DATABASE_REPLICA_PIN_SECONDS", DATABASE_REPLICA_MAX_LAG)
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = env.float("DATABASE_REPLICA_LAG_CHECK_INTERVAL", 5)
+
+# Each waitress thread keeps its connection for CONN_MAX_AGE seconds, and on PostgreSQL
+# the connections come from a bounded per-process pool that health checks them on checkout.
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = env.int("DATABASE_CONN_MAX_AGE", 60)
+    if database['ENGINE'] == 'django.db.backends.postgresql':
+        database['ENGINE'] = 'backend_app_32996.db.postgresql'
+        database['POOL'] = {
+            'MAX_SIZE': env.int("DATABASE_POOL_MAX_SIZE", 10),
+            'IDLE_TIMEOUT': env.int("DATABASE_POOL_IDLE_TIMEOUT", 300),
+            'CHECKOUT_TIMEOUT': env.float("DATABASE_POOL_CHECKOUT_TIMEOUT", 5),
+        }
+
+# Shared cache, Redis when REDIS_URL is set and an in-memory per-process cache otherwise.
+# Redis errors are ignored so an outage turns into cache misses instead of 500s.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+if env.str("REDIS_URL", default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': env.str("REDIS_URL"),
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'IGNORE_EXCEPTIONS': True,
+            },
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -205,9 +252,36 @@ REST_AUTH_REGISTER_SERIALIZERS = {
 }
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'home.api.v1.authentication.CachedTokenAuthentication',
     ],
 }
+# Two-tier caches (tokens, plans): an in-process LRU in front of CACHES.
+# Invalidations reach the other workers through CACHE_INVALIDATION_URL, redis://...
+# for pub/sub or unix:///<directory> for local sockets, only this process when empty.
+CACHE_INVALIDATION_URL = env.str("CACHE_INVALIDATION_URL", env.str("REDIS_URL", ""))
+PLAN_CATALOG_LOCAL_TTL = env.int("PLAN_CATALOG_LOCAL_TTL", 300)
+PLAN_CATALOG_SHARED_TTL = env.int("PLAN_CATALOG_SHARED_TTL", 3600)
+# Token key -> user cache used by CachedTokenAuthentication
+TOKEN_CACHE_MAX_SIZE = env.int("TOKEN_CACHE_MAX_SIZE", 10000)
+TOKEN_CACHE_TTL = env.int("TOKEN_CACHE_TTL", 300)
+# Share of the requests timed by PerformanceMiddleware, and samples kept per route.
+# Only staff users (everyone with DEBUG) get the Server-Timing header of a timed request.
+PERF_SAMPLE_RATE = env.float("PERF_SAMPLE_RATE", 0.01)
+PERF_WINDOW_SIZE = env.int("PERF_WINDOW_SIZE", 1000)
+# Per-user cache of the app and subscription read responses
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = env.int("API_CACHE_TIMEOUT", 300)
+# Keyset pagination of the app and subscription list endpoints
+API_PAGE_SIZE = env.int("API_PAGE_SIZE", 50)
+API_MAX_PAGE_SIZE = env.int("API_MAX_PAGE_SIZE", 500)
+# Largest payload accepted by the /api/v1/apps/bulk/ endpoints
+API_BULK_MAX_ITEMS = env.int("API_BULK_MAX_ITEMS", 1000)
+# Rows fetched and encoded at a time by the streaming /api/v1/export/ endpoint
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", 2000)
+# Screenshot uploads, thumbnails are generated by a bounded background thread pool
+SCREENSHOT_MAX_UPLOAD_SIZE = env.int("SCREENSHOT_MAX_UPLOAD_SIZE", 10 * 1024 * 1024)
+SCREENSHOT_THUMBNAIL_SIZES = [(128, 128), (320, 320), (640, 640)]
+SCREENSHOT_THUMBNAIL_WORKERS = env.int("SCREENSHOT_THUMBNAIL_WORKERS", 2)
 
 # Custom user model
 AUTH_USER_MODEL = "users.User"
@@ -217,6 +291,10 @@ EMAIL_HOST_USER = env.str("SENDGRID_USERNAME", "")
 EMAIL_HOST_PASSWORD = env.str("SENDGRID_PASSWORD", "")
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
+# Mail is queued in the database during the request and delivered over EMAIL_DELIVERY_BACKEND
+# by `manage.py send_queued_email`, see home/email_queue.py.
+EMAIL_BACKEND = "home.email_queue.QueuedEmailBackend"
+EMAIL_DELIVERY_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 
 
 # AWS S3 config
@@ -0,0 +1,11 @@
+"""
+Settings for the test suite, see pytest.ini.
+
+The project settings with the variables a checkout has no .env for,
+the environment and .env still take precedence.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from backend_app_32996.settings import *  # noqa: E402,F401,F403
@@ -6,3 +6,4 @@ admin.site.register(App)
 admin.site.register(Plan)
 # admin.site.register(UserDetails)
 admin.site.register(Subscription)
+admin.site.register(QueuedEmail)
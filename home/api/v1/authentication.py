@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from home.tiered_cache import TwoTierCache
+
+
+# token key -> (user id, active flag). Entries are evicted by the signal
+# handlers in `home.signals` when a token is deleted or its user changes.
+token_cache = TwoTierCache(
+    "tokens",
+    max_size=getattr(settings, "TOKEN_CACHE_MAX_SIZE", 10000),
+    local_ttl=getattr(settings, "TOKEN_CACHE_TTL", 300),
+    shared_ttl=getattr(settings, "TOKEN_CACHE_TTL", 300),
+)
+# Seconds an evicted key can't be cached again, longer than a lookup and its commit
+TOKEN_EVICTION_TTL = 30
+
+
+def evict_tokens(*keys):
+    token_cache.evict(*keys, ttl=TOKEN_EVICTION_TTL)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for DRF's TokenAuthentication that resolves known
+    token keys from `token_cache` without touching the database.
+
+    On a cache hit `request.user` is a User instance with only `id` and
+    `is_active` loaded, any other attribute is fetched lazily on first access.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            user, token = self._load_credentials(key)
+            # Not stored if the token was deleted or its user changed since it was read
+            token_cache.fill(key, (user.pk, user.is_active))
+        else:
+            user_id, is_active = cached
+            user = get_user_model().from_db(DEFAULT_DB_ALIAS, ["id", "is_active"], [user_id, is_active])
+            token = self.get_model()(key=key, user_id=user_id)
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (user, token)
+
+    def _load_credentials(self, key):
+        model = self.get_model()
+        try:
+            # From the primary, the token of a login may not have reached the read replicas yet
+            token = model.objects.using(DEFAULT_DB_ALIAS).select_related('user').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        return token.user, token
@@ -0,0 +1,141 @@
+import functools
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from backend_app_32996.db.router import max_lag, may_be_stale
+from home.api.v1.conditional import Validators, not_modified, set_validators
+
+
+class ResponseCache:
+    """
+    Per-user cache of the API read responses in the shared (Redis) cache.
+
+    Entries are keyed by the user's data version, the plan version and the
+    request URL, so invalidation is a single version bump: entries written for
+    an older version are never read again and simply expire. Versions start
+    from the current time in milliseconds, an evicted version key can't bring
+    back entries stored under an earlier one. Each bump also records when it
+    happened, responses read while a replica can miss the change aren't stored.
+    """
+
+    def __init__(self, alias="default", timeout=300):
+        self.alias = alias
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def lookup(self, request):
+        """
+        (key, entry, changed at) of a request, entry is None on a miss and
+        changed at the time of the last recent change to the user or the plans.
+        """
+        user_key, plans_key = self._user_version_key(request.user.id), self._plans_version_key()
+        versions = self.cache.get_many([user_key, plans_key, self._changed_key(user_key), self._changed_key(plans_key)])
+        user_version = versions.get(user_key) or self._start_version(user_key)
+        plans_version = versions.get(plans_key) or self._start_version(plans_key)
+        changed = [versions[key] for key in (self._changed_key(user_key), self._changed_key(plans_key)) if key in versions]
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f"api:response:{request.user.id}:{user_version}:{plans_version}:{url}"
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return key, entry, max(changed, default=None)
+
+    def store(self, key, response, changed_at=None):
+        if may_be_stale(changed_at):
+            return
+        self.cache.set(key, {
+            "data": response.data,
+            "etag": response["ETag"],
+            "last_modified": response.get("Last-Modified"),
+        }, self.timeout)
+
+    def invalidate_user(self, user_id):
+        # Bumped again on commit, a read done before the commit would otherwise
+        # cache the old rows under the new version
+        self._bump(self._user_version_key(user_id))
+        transaction.on_commit(lambda: self._bump(self._user_version_key(user_id)))
+
+    def invalidate_plans(self):
+        self._bump(self._plans_version_key())
+        transaction.on_commit(lambda: self._bump(self._plans_version_key()))
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else None,
+            "backend": settings.CACHES[self.alias]["BACKEND"],
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def _user_version_key(self, user_id):
+        return f"api:version:user:{user_id}"
+
+    def _plans_version_key(self):
+        return "api:version:plans"
+
+    def _changed_key(self, version_key):
+        return version_key + ":changed"
+
+    def _start_version(self, key):
+        self.cache.add(key, int(time.time() * 1000), None)
+        return self.cache.get(key)
+
+    def _bump(self, key):
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self._start_version(key)
+        self.cache.set(self._changed_key(key), time.time(), math.ceil(max_lag()) + 1)
+
+
+response_cache = ResponseCache(
+    alias=getattr(settings, "API_CACHE_ALIAS", "default"),
+    timeout=getattr(settings, "API_CACHE_TIMEOUT", 300),
+)
+
+
+def cache_response(view):
+    """
+    Serve a list/retrieve action from `response_cache`. Only 200 responses
+    carrying validators are stored, a hit still answers conditional requests
+    with a 304 and doesn't touch the database. A miss reads from a replica like
+    any other request, unless the client is pinned to the primary.
+    """
+    @functools.wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        key, entry, changed_at = response_cache.lookup(request)
+        if entry is not None:
+            validators = Validators(entry["etag"], parse_http_date_safe(entry["last_modified"]) if entry["last_modified"] else None)
+            return not_modified(request, validators) or set_validators(Response(data=entry["data"]), validators)
+        response = view(self, request, *args, **kwargs)
+        if response.status_code == 200 and response.has_header("ETag"):
+            # Skipped while a replica may miss the change, the entry would be
+            # served to all of the user's clients
+            response_cache.store(key, response, changed_at)
+        return response
+
+    return wrapper
@@ -0,0 +1,92 @@
+import hashlib
+from collections import namedtuple
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from home.catalog import plan_catalog
+
+# Strong ETag and Last-Modified (epoch seconds) of a response
+Validators = namedtuple("Validators", ["etag", "last_modified"])
+
+# Columns of an ?expand= relation that its serialized form depends on, they go
+# into the ETag. Users have no updated_at, and the plans are covered by the
+# catalog version.
+EXPANDED_VERSION_FIELDS = {
+    "app": ("app__updated_at",),
+    "user": ("user__email", "user__name"),
+}
+
+
+def list_validators(request, queryset, expand=()):
+    """
+    Validators for a list response, computed from one aggregate query rather
+    than from the serialized body. The request path is part of the ETag so
+    every page, page size and field selection gets its own tag, and the
+    `expand`ed relations are folded into the same query.
+
+    Lists get no Last-Modified: deleting any row but the newest leaves
+    max(updated_at) as it was, only the count in the ETag moves.
+    """
+    lookups = _expanded_lookups(expand)
+    aggregate = queryset.aggregate(
+        last_modified=Max("updated_at"), count=Count("id"), **{lookup: Max(lookup) for lookup in lookups}
+    )
+    last_modified = aggregate["last_modified"]
+    version = [aggregate["count"], last_modified.isoformat() if last_modified else ""]
+    version += [aggregate[lookup] for lookup in lookups] + _catalog_version(expand)
+    etag, _ = _validators(request, version, last_modified)
+    return Validators(etag, None)
+
+
+def object_validators(request, obj, expand=()):
+    """
+    Validators for a detail response. An expanded relation can change without
+    `obj.updated_at` moving, so those responses only get the ETag.
+    """
+    version = [obj.pk, obj.updated_at.isoformat()]
+    version += [_related_value(obj, lookup) for lookup in _expanded_lookups(expand)] + _catalog_version(expand)
+    etag, last_modified = _validators(request, version, obj.updated_at)
+    return Validators(etag, None if expand else last_modified)
+
+
+def not_modified(request, validators):
+    """
+    The 304 (or 412) response for a matching If-None-Match/If-Modified-Since
+    (or failing If-Match/If-Unmodified-Since), None when the body must be sent.
+    """
+    response = get_conditional_response(
+        request, etag=validators.etag, last_modified=validators.last_modified
+    )
+    if response is not None:
+        set_validators(response, validators)
+    return response
+
+
+def set_validators(response, validators):
+    response["ETag"] = validators.etag
+    if validators.last_modified is not None:
+        response["Last-Modified"] = http_date(validators.last_modified)
+    return response
+
+
+def _validators(request, version, last_modified):
+    version = "|".join("" if part is None else str(part) for part in version)
+    digest = hashlib.md5(f"{request.user.id}|{request.get_full_path()}|{version}".encode()).hexdigest()
+    return Validators(quote_etag(digest), int(last_modified.timestamp()) if last_modified else None)
+
+
+def _expanded_lookups(expand):
+    return [lookup for name in expand for lookup in EXPANDED_VERSION_FIELDS.get(name, ())]
+
+
+def _catalog_version(expand):
+    return [plan_catalog.version()] if "plan" in expand else []
+
+
+def _related_value(obj, lookup):
+    # app__updated_at -> obj.app.updated_at, the relation is select_related with the object
+    for name in lookup.split("__"):
+        obj = getattr(obj, name)
+    return obj
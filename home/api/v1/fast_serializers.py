@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.settings import api_settings
+
+from home import screenshots
+from home.instrumentation import timed
+from home.api.v1.serializers import AppSerializer, PlanSerializer, SubscriptionSerializer
+
+
+def datetime_formatter():
+    """
+    Same output as DRF's DateTimeField.to_representation, with the settings and
+    timezone lookups done once instead of once per value.
+    """
+    output_format = api_settings.DATETIME_FORMAT
+    field_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+    iso = output_format is not None and output_format.lower() == ISO_8601
+
+    def format_datetime(value):
+        if not value:
+            return None
+        if output_format is None:
+            return value
+        if field_timezone is not None:
+            value = value.astimezone(field_timezone) if timezone.is_aware(value) else timezone.make_aware(value, field_timezone)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, timezone.utc)
+        if iso:
+            value = value.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return value.strftime(output_format)
+
+    return format_datetime
+
+
+class ValuesSerializer:
+    """
+    Read-only counterpart of `serializer_class` for list responses.
+
+    Rows are read with `values_list()` and turned straight into dicts, no model
+    instance or field object is built per row. Only valid for serializers whose
+    fields map one to one onto model columns, the output is the same JSON.
+    `converters` maps the fields whose JSON isn't the column value as is to
+    the function producing it.
+    """
+    serializer_class = None
+    converters = {}
+
+    def __init__(self, fields=None):
+        meta = self.serializer_class.Meta
+        self.fields = tuple(name for name in meta.fields if not fields or name in fields)
+        self.datetime_indexes = tuple(
+            index for index, name in enumerate(self.fields)
+            if isinstance(meta.model._meta.get_field(name), models.DateTimeField)
+        )
+        self.converted = tuple(
+            (index, self.converters[name]) for index, name in enumerate(self.fields) if name in self.converters
+        )
+
+    def values(self, queryset):
+        # id and created_at are also read for the keyset pagination cursor
+        columns = tuple(dict.fromkeys(self.fields + ('id', 'created_at')))
+        return queryset.values_list(*columns, named=True)
+
+    @timed("serialize")
+    def to_representation(self, rows):
+        format_datetime = datetime_formatter()
+        names = self.fields
+        width = len(names)
+        datetime_indexes = self.datetime_indexes
+        converted = self.converted
+        data = []
+        for row in rows:
+            values = list(row[:width])
+            for index in datetime_indexes:
+                values[index] = format_datetime(values[index])
+            for index, convert in converted:
+                values[index] = convert(values[index])
+            data.append(dict(zip(names, values)))
+        return data
+
+
+class AppValuesSerializer(ValuesSerializer):
+    serializer_class = AppSerializer
+    converters = {'screenshot': screenshots.screenshot_urls}
+
+
+class PlanValuesSerializer(ValuesSerializer):
+    serializer_class = PlanSerializer
+
+
+class SubscriptionValuesSerializer(ValuesSerializer):
+    serializer_class = SubscriptionSerializer
@@ -0,0 +1,115 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import ugettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over `(created_at, id)`.
+
+    Pages are selected with a range condition on the ordering columns instead
+    of an OFFSET, so with the matching `(user, created_at, id)` index every page
+    costs the same as the first one. Cursors are opaque base64 strings holding
+    the direction and the position of the first/last row of the current page.
+    """
+    page_size = getattr(settings, "API_PAGE_SIZE", 50)
+    max_page_size = getattr(settings, "API_MAX_PAGE_SIZE", 500)
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+        self.reverse = cursor is not None and cursor[0]
+
+        if cursor is None:
+            queryset = queryset.order_by("created_at", "id")
+        else:
+            reverse, created_at, pk = cursor
+            if reverse:
+                queryset = queryset.filter(created_at__lte=created_at).filter(
+                    Q(created_at__lt=created_at) | Q(id__lt=pk)
+                ).order_by("-created_at", "-id")
+            else:
+                queryset = queryset.filter(created_at__gte=created_at).filter(
+                    Q(created_at__gt=created_at) | Q(id__gt=pk)
+                ).order_by("created_at", "id")
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        # Going backwards there is always a page after this one (the page we
+        # came from), going forwards there is one before unless we started here.
+        self.has_next = has_more if not self.reverse else True
+        self.has_previous = has_more if self.reverse else cursor is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(True, self.page[0])
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            reverse, created_at, pk = urlsafe_b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+            created_at = parse_datetime(created_at)
+            if created_at is None or reverse not in ("0", "1"):
+                raise ValueError
+            return reverse == "1", created_at, int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, reverse, item):
+        position = f"{int(reverse)}|{item.created_at.isoformat()}|{item.id}"
+        encoded = urlsafe_b64encode(position.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
@@ -2,12 +2,16 @@ from django.http import HttpRequest
 from django.utils.translation import ugettext_lazy as _
 from allauth.account import app_settings as allauth_settings
 from allauth.account.forms import ResetPasswordForm
-from allauth.utils import email_address_exists, generate_unique_username
+from allauth.utils import email_address_exists
 from allauth.account.adapter import get_adapter
 from allauth.account.utils import setup_user_email
 from rest_framework import serializers
 from rest_auth.serializers import PasswordResetSerializer
 from home.models import *
+from home import screenshots
+from home.instrumentation import InstrumentedSerializerMixin
+from home.catalog import plan_catalog
+from home.usernames import save_with_unique_username
 from home.constants import APP_CHOICES_LIST, FRAMEWORK_CHOICES_LIST
 
 
@@ -49,14 +53,13 @@ class SignupSerializer(serializers.ModelSerializer):
         user = User(
             email=validated_data.get('email'),
             name=validated_data.get('name'),
-            username=generate_unique_username([
-                validated_data.get('name'),
-                validated_data.get('email'),
-                'user'
-            ])
         )
         user.set_password(validated_data.get('password'))
-        user.save()
+        save_with_unique_username(user, [
+            validated_data.get('name'),
+            validated_data.get('email'),
+            'user'
+        ])
         request = self._get_request()
         setup_user_email(request, user, [])
         return user
@@ -76,10 +79,47 @@ class PasswordSerializer(PasswordResetSerializer):
     """Custom serializer for rest_auth to solve reset password error"""
     password_reset_form_class = ResetPasswordForm
 
-class AppSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    # Serializer mixin for ?fields=id,name,... the fields that were not asked for are
+    # dropped from the output, and only() keeps their columns from being read at all
+    # Always loaded: needed for the ownership check, the keyset cursor and the ETag
+    always_loaded = ('id', 'user', 'created_at', 'updated_at')
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, value):
+        fields = tuple(dict.fromkeys(name for name in (value or '').split(',') if name))
+        unknown = [name for name in fields if name not in cls.Meta.fields]
+        if unknown:
+            raise serializers.ValidationError({'fields': [_(f'{name} is not a valid field. Valid values are {cls.Meta.fields}') for name in unknown]})
+        return fields or None
+
+    @classmethod
+    def only(cls, queryset, fields):
+        if not fields:
+            return queryset
+        return queryset.only(*dict.fromkeys(cls.always_loaded + fields))
+
+class ScreenshotField(serializers.Field):
+    # URLs of the screenshot stored by the upload endpoint and of its thumbnails
+    def __init__(self, **kwargs):
+        kwargs.update(read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, name):
+        return screenshots.screenshot_urls(name)
+
+class AppSerializer(SparseFieldsMixin, InstrumentedSerializerMixin, serializers.ModelSerializer):
     # App Model Serializer for CRUD operations
     type = serializers.CharField(max_length=6)
     framework = serializers.CharField(max_length=12)
+    screenshot = ScreenshotField()
     class Meta:
         model = App
         fields = ['id', 'name', 'description', 'type', 'framework', 'domain_name', 'screenshot', 'subscription', 'user', 'created_at', 'updated_at']
@@ -98,20 +138,29 @@ class AppSerializer(serializers.ModelSerializer):
 
     # Overriding create method for fields values overriding
     def create(self, validated_data):
-        app = App(
+        app = self.build(validated_data)
+        app.save()
+        return app
+
+    # Unsaved App for validated data, shared with the bulk create endpoint
+    def build(self, validated_data):
+        return App(
             name=validated_data.get('name'),
             type=validated_data.get('type'),
             description=validated_data.get('description'),
             framework=validated_data.get('framework'),
             domain_name=validated_data.get('domain_name'),
-            screenshot=f"{validated_data.get('name').replace(' ', '_').lower()}_screenshot.png",
             user = validated_data.get('user')
         )
-        app.save()
-        return app
 
     # Overriding update method for selective fields update
     def update(self, instance, validated_data):
+        self.assign(instance, validated_data)
+        instance.save()
+        return instance
+
+    # Applies validated data without saving, shared with the bulk update endpoint
+    def assign(self, instance, validated_data):
         instance.name=validated_data.get('name')
         instance.type=validated_data.get('type')
         instance.framework=validated_data.get('framework')
@@ -119,17 +168,75 @@ class AppSerializer(serializers.ModelSerializer):
             instance.description=validated_data.get('description')
         if 'domain_name' in validated_data:
             instance.domain_name=validated_data.get('domain_name')
-        instance.save()
         return instance
 
+class BulkAppSerializer(AppSerializer):
+    # App serializer for the bulk endpoints, the owner comes from the request and
+    # subscriptions are set by the activation service, so neither is looked up per item
+    class Meta(AppSerializer.Meta):
+        read_only_fields = ['subscription', 'user']
+
 class PlanSerializer(serializers.ModelSerializer):
     # Plan Model Serializer for CRUD operations
     class Meta:
         model = Plan
         fields = ['id', 'name', 'description', 'price', 'created_at', 'updated_at']
 
-class SubscriptionSerializer(serializers.ModelSerializer):
+class CatalogPlanField(serializers.PrimaryKeyRelatedField):
+    # Resolves the plan from the in-memory catalog instead of querying the Plan table
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            plan = plan_catalog.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if plan is None:
+            self.fail('does_not_exist', pk_value=data)
+        return plan
+
+class ExpandedPlanField(serializers.Field):
+    # Inlines the pre-rendered catalog payload of the plan, no query or join needed
+    def __init__(self, **kwargs):
+        kwargs.update(source='plan_id', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, plan_id):
+        return plan_catalog.payload(plan_id)
+
+class SubscriptionSerializer(SparseFieldsMixin, InstrumentedSerializerMixin, serializers.ModelSerializer):
     # Subscription Model Serializer for CRUD operations
+    plan = CatalogPlanField(queryset=Plan.objects.all())
+
+    # Relations that ?expand= can inline, and what the queryset must select_related for them
+    expandable_fields = {
+        'plan': (ExpandedPlanField, None),
+        'app': (AppSerializer, 'app'),
+        'user': (UserSerializer, 'user'),
+    }
+
     class Meta:
         model = Subscription
-        fields = ['id', 'user', 'plan', 'app', 'active', 'created_at', 'updated_at']
\ No newline at end of file
+        fields = ['id', 'user', 'plan', 'app', 'active', 'created_at', 'updated_at']
+
+    def __init__(self, *args, **kwargs):
+        expand = kwargs.pop('expand', ())
+        super().__init__(*args, **kwargs)
+        for name in expand:
+            if name not in self.fields:
+                continue
+            field_class, _ = self.expandable_fields[name]
+            self.fields[name] = field_class(read_only=True)
+
+    @classmethod
+    def parse_expand(cls, value, fields=None):
+        # Validates an ?expand=plan,app value, returns the names and the select_related
+        # lookups, relations left out by ?fields= are neither expanded nor joined
+        expand = tuple(name for name in (value or '').split(',') if name)
+        unknown = [name for name in expand if name not in cls.expandable_fields]
+        if unknown:
+            raise serializers.ValidationError({'expand': [_(f'{name} can not be expanded. Valid values are {list(cls.expandable_fields)}') for name in unknown]})
+        if fields:
+            expand = tuple(name for name in expand if name in fields)
+        select_related = [cls.expandable_fields[name][1] for name in expand if cls.expandable_fields[name][1]]
+        return expand, select_related
\ No newline at end of file
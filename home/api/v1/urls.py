@@ -1,11 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from home.api.v1.export import ExportViewSet
 from home.api.v1.viewsets import (
     SignupViewSet,
     LoginViewSet,
     PasswordViewSet,
     AppViewSet,
+    CacheStatsViewSet,
+    DatabaseStatsViewSet,
+    PerformanceStatsViewSet,
     PlanViewSet,
     SubscriptionViewSet
 )
@@ -20,6 +24,10 @@ router.register("plans", PlanViewSet, basename="plans")
 router.register("plans/<int:plan_id>/?", PlanViewSet, basename="plan")
 router.register("subscriptions", SubscriptionViewSet, basename="subscriptions")
 router.register("subscriptions/<int:subscription_id>/?", SubscriptionViewSet, basename="subscription")
+router.register("export", ExportViewSet, basename="export")
+router.register("cache-stats", CacheStatsViewSet, basename="cache-stats")
+router.register("perf-stats", PerformanceStatsViewSet, basename="perf-stats")
+router.register("db-stats", DatabaseStatsViewSet, basename="db-stats")
 
 urlpatterns = [
     path("", include(router.urls))
@@ -1,4 +1,11 @@
+from django.conf import settings
+from backend_app_32996.db import pool as db_pool, router as db_router
+from django.db import transaction
+from django.utils import timezone
 from rest_framework.authtoken.serializers import AuthTokenSerializer
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser
 from rest_framework.viewsets import ModelViewSet, ViewSet
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
@@ -6,22 +13,35 @@ from rest_framework import status
 from home.models import *
 from rest_framework import permissions
 
+from home import screenshots, tiered_cache
+from home.instrumentation import InstrumentedViewMixin, route_stats
+from home.catalog import plan_catalog
+from home.api.v1.caching import cache_response, response_cache
+from home.api.v1.conditional import list_validators, not_modified, object_validators, set_validators
+from home.api.v1.fast_serializers import AppValuesSerializer, SubscriptionValuesSerializer
+from home.api.v1.pagination import KeysetPagination
 from home.api.v1.serializers import (
     SignupSerializer,
     UserSerializer,
     PasswordSerializer,
     AppSerializer,
+    BulkAppSerializer,
     PlanSerializer,
     SubscriptionSerializer
 )
 
 
-class SignupViewSet(ModelViewSet):
+class SignupViewSet(InstrumentedViewMixin, ModelViewSet):
     serializer_class = SignupSerializer
     http_method_names = ["post"]
 
+    def create(self, request, *args, **kwargs):
+        # The user and its confirmation mail, queued by home.email_queue, commit together
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
+
 
-class LoginViewSet(ViewSet):
+class LoginViewSet(InstrumentedViewMixin, ViewSet):
     """Based on rest_framework.authtoken.views.ObtainAuthToken"""
 
     serializer_class = AuthTokenSerializer
@@ -36,34 +56,48 @@ class LoginViewSet(ViewSet):
         user_serializer = UserSerializer(user)
         return Response({"token": token.key, "user": user_serializer.data})
 
-class PasswordViewSet(ModelViewSet):
+class PasswordViewSet(InstrumentedViewMixin, ModelViewSet):
     serializer_class = PasswordSerializer
     http_method_names = ["post"]
 
-class AppViewSet(ModelViewSet):
+    def create(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
+
+class AppViewSet(InstrumentedViewMixin, ModelViewSet):
     # we are telling we have to use AppSerializer for the JSON conversion of AppViewSet
     serializer_class = AppSerializer
     queryset = App.objects.all()
     permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = KeysetPagination
 
+    @cache_response
     def list(self, request, *args, **kwargs):
-        token = Token.objects.get(key=request.auth.key)
-        apps = App.objects.filter(user=token.user_id)
-        return Response(data=AppSerializer(apps, many=True).data)
+        fields = AppSerializer.parse_fields(request.query_params.get('fields'))
+        apps = App.objects.filter(user=request.user.id)
+        validators = list_validators(request, apps)
+        response = not_modified(request, validators)
+        if response is not None:
+            return response
+        serializer = AppValuesSerializer(fields)
+        apps = self.paginate_queryset(serializer.values(apps))
+        return set_validators(self.get_paginated_response(serializer.to_representation(apps)), validators)
 
 
+    @cache_response
     def retrieve(self, request, *args, **kwargs):
         app_id = kwargs['pk']
-        app = App.objects.filter(id=app_id).first()
-        token = Token.objects.get(key=request.auth.key)
+        fields = AppSerializer.parse_fields(request.query_params.get('fields'))
+        app = AppSerializer.only(App.objects.filter(id=app_id), fields).first()
         if app is None:
             return Response(data={"message": f"No App found against id {app_id}."}, status=status.HTTP_404_NOT_FOUND)
-        if app.user_id != token.user_id:
+        if app.user_id != request.user.id:
             return Response(data={"message": f"User is not authorized to retrieve app having id {app_id}."},status=status.HTTP_403_FORBIDDEN)
-        return Response(data=AppSerializer(app).data)
+        validators = object_validators(request, app)
+        return not_modified(request, validators) or set_validators(Response(data=AppSerializer(app, fields=fields).data), validators)
 
     def create(self, request, *args, **kwargs):
-        request.data['user'] = Token.objects.get(key=request.auth.key).user_id
+        request.data['user'] = request.user.id
         serializer = self.serializer_class(
             data=request.data, context={"request": request}
         )
@@ -73,10 +107,9 @@ class AppViewSet(ModelViewSet):
     def update(self, request, *args, **kwargs):
         app_id = kwargs['pk']
         app = App.objects.filter(id=app_id).first()
-        token = Token.objects.get(key=request.auth.key)
         if app is None:
             return Response(data={"message": f"No App found to update against id {app_id}."}, status=status.HTTP_404_NOT_FOUND)
-        if app.user_id != token.user_id:
+        if app.user_id != request.user.id:
             return Response(data={"message": f"User is not authorized to modify app having id {app_id}."}, status=status.HTTP_403_FORBIDDEN)
         serializer = self.serializer_class(
             data=request.data, context={"request": request}
@@ -87,49 +120,199 @@ class AppViewSet(ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         app_id = kwargs['pk']
         app = App.objects.filter(id=app_id).first()
-        token = Token.objects.get(key=request.auth.key)
         if app is None:
             return Response(data={"message": f"No App found to delete against id {app_id}."}, status=status.HTTP_404_NOT_FOUND)
-        if app.user_id != token.user_id:
+        if app.user_id != request.user.id:
             return Response(data={"message": f"User is not authorized to retrieve app having id {app_id}."}, status=status.HTTP_403_FORBIDDEN)
         App.objects.filter(id=app_id).delete()
         return Response(data={"message": f"App deleted successfully."})
 
+    @action(detail=True, methods=["put"], parser_classes=[MultiPartParser])
+    def screenshot(self, request, *args, **kwargs):
+        app_id = kwargs['pk']
+        app = App.objects.filter(id=app_id).first()
+        if app is None:
+            return Response(data={"message": f"No App found to update against id {app_id}."}, status=status.HTTP_404_NOT_FOUND)
+        if app.user_id != request.user.id:
+            return Response(data={"message": f"User is not authorized to modify app having id {app_id}."}, status=status.HTTP_403_FORBIDDEN)
+        # Must be set before request.data is first read
+        handler = screenshots.HashingUploadHandler(request._request)
+        request._request.upload_handlers = [handler]
+        upload = request.data.get('screenshot')
+        if handler.too_large:
+            return Response(data={"message": f"Screenshot is larger than {settings.SCREENSHOT_MAX_UPLOAD_SIZE} bytes."}, status=status.HTTP_400_BAD_REQUEST)
+        if upload is None:
+            return Response(data={"message": "No screenshot file uploaded."}, status=status.HTTP_400_BAD_REQUEST)
+        image_format = screenshots.image_format(upload)
+        if image_format is None:
+            return Response(data={"message": f"Screenshot must be one of {list(screenshots.IMAGE_FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        app.screenshot = screenshots.store_screenshot(upload, image_format)
+        app.save(update_fields=['screenshot', 'updated_at'])
+        screenshots.schedule_thumbnails(app.screenshot)
+        return Response(data=AppSerializer(app).data)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = BulkAppSerializer(
+            data=request.data, many=True, max_length=settings.API_BULK_MAX_ITEMS, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        apps = [serializer.child.build(item) for item in serializer.validated_data]
+        for app in apps:
+            app.user_id = request.user.id
+        with transaction.atomic():
+            App.objects.bulk_create(apps)
+            # bulk_create and bulk_update don't send post_save
+            response_cache.invalidate_user(request.user.id)
+        return Response(data=BulkAppSerializer(apps, many=True).data, status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.put
+    def bulk_update(self, request, *args, **kwargs):
+        items = self._bulk_items(request.data)
+        if isinstance(items, Response):
+            return items
+        serializer = BulkAppSerializer(data=items, many=True, context={"request": request})
+        serializer.is_valid()
+        errors = serializer.errors if serializer.errors else [{} for _ in items]
+        ids = [self._bulk_id(item.get("id")) if isinstance(item, dict) else None for item in items]
+        apps = App.objects.filter(user=request.user.id, id__in=[i for i in ids if i is not None]).in_bulk()
+        for index, app_id in enumerate(ids):
+            if app_id is None:
+                errors[index] = dict(errors[index], id=["A valid integer is required."])
+            elif app_id not in apps:
+                errors[index] = dict(errors[index], id=[f"No App found to update against id {app_id}."])
+        if any(errors):
+            return Response(data=errors, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        for app_id, validated_data in zip(ids, serializer.validated_data):
+            serializer.child.assign(apps[app_id], validated_data).updated_at = now
+        with transaction.atomic():
+            App.objects.bulk_update(
+                apps.values(), ["name", "type", "framework", "description", "domain_name", "updated_at"]
+            )
+            response_cache.invalidate_user(request.user.id)
+        return Response(data=BulkAppSerializer([apps[app_id] for app_id in ids], many=True).data)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        items = self._bulk_items(request.data)
+        if isinstance(items, Response):
+            return items
+        ids = [self._bulk_id(item) for item in items]
+        owned = set(App.objects.filter(user=request.user.id, id__in=[i for i in ids if i is not None]).values_list("id", flat=True))
+        errors = [
+            {"id": ["A valid integer is required."]} if app_id is None
+            else {} if app_id in owned
+            else {"id": [f"No App found to delete against id {app_id}."]}
+            for app_id in ids
+        ]
+        if any(errors):
+            return Response(data=errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            App.objects.filter(user=request.user.id, id__in=owned).delete()
+        return Response(data={"message": f"{len(owned)} Apps deleted successfully."})
 
-class PlanViewSet(ModelViewSet):
+    def _bulk_items(self, data):
+        if not isinstance(data, list):
+            return Response(data={"message": "Expected a list of items."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(data) > settings.API_BULK_MAX_ITEMS:
+            return Response(data={"message": f"At most {settings.API_BULK_MAX_ITEMS} items can be sent at once."}, status=status.HTTP_400_BAD_REQUEST)
+        return data
+
+    def _bulk_id(self, value):
+        # None unless an int, bools are ints and e.g. True would match the app with id 1
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        return None
+
+
+class PlanViewSet(InstrumentedViewMixin, ModelViewSet):
     # we are telling we have to use PlanSerializer for the JSON conversion of PlanViewSet
     serializer_class = PlanSerializer
     queryset = Plan.objects.all()
     http_method_names = ["get"]
     permission_classes = (permissions.IsAuthenticated,)
 
+    # Plans are served from the pre-rendered catalog, without the ORM or serializer
+    def list(self, request, *args, **kwargs):
+        return Response(data=plan_catalog.list())
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            payload = plan_catalog.payload(int(kwargs['pk']))
+        except ValueError:
+            payload = None
+        if payload is None:
+            raise NotFound()
+        return Response(data=payload)
+
+
+class CacheStatsViewSet(InstrumentedViewMixin, ViewSet):
+    # Hit/miss counters of the caches in this worker process
+    permission_classes = (permissions.IsAdminUser,)
+
+    def list(self, request):
+        return Response(data={"responses": response_cache.stats(), "tiered": tiered_cache.stats()})
 
-class SubscriptionViewSet(ModelViewSet):
+
+class DatabaseStatsViewSet(InstrumentedViewMixin, ViewSet):
+    # Connection pools (empty unless the backend is pooled) and replica routing of this worker process
+    permission_classes = (permissions.IsAdminUser,)
+
+    def list(self, request):
+        return Response(data={"pools": db_pool.stats(), "routing": db_router.stats()})
+
+
+class PerformanceStatsViewSet(InstrumentedViewMixin, ViewSet):
+    # Rolling per-route timings of the sampled requests in this worker process
+    permission_classes = (permissions.IsAdminUser,)
+
+    def list(self, request):
+        return Response(data=route_stats.summary())
+
+
+class SubscriptionViewSet(InstrumentedViewMixin, ModelViewSet):
     # we are telling we have to use SubscriptionSerializer for the JSON conversion of SubscriptionViewSet
     serializer_class = SubscriptionSerializer
     queryset = Subscription.objects.all()
     permission_classes = (permissions.IsAuthenticated,)
     http_method_names = ["get", "post", "put"]
+    pagination_class = KeysetPagination
 
 
+    @cache_response
     def list(self, request, *args, **kwargs):
-        token = Token.objects.get(key=request.auth.key)
-        subscriptions = Subscription.objects.filter(user=token.user_id)
-        return Response(data=SubscriptionSerializer(subscriptions, many=True).data)
+        fields = SubscriptionSerializer.parse_fields(request.query_params.get('fields'))
+        expand, select_related = SubscriptionSerializer.parse_expand(request.query_params.get('expand'), fields)
+        subscriptions = Subscription.objects.filter(user=request.user.id)
+        validators = list_validators(request, subscriptions, expand)
+        response = not_modified(request, validators)
+        if response is not None:
+            return response
+        if not expand:
+            serializer = SubscriptionValuesSerializer(fields)
+            subscriptions = self.paginate_queryset(serializer.values(subscriptions))
+            return set_validators(self.get_paginated_response(serializer.to_representation(subscriptions)), validators)
+        subscriptions = self.paginate_queryset(SubscriptionSerializer.only(subscriptions.select_related(*select_related), fields))
+        return set_validators(self.get_paginated_response(SubscriptionSerializer(subscriptions, many=True, expand=expand, fields=fields).data), validators)
 
+    @cache_response
     def retrieve(self, request, *args, **kwargs):
         subscription_id = kwargs['pk']
-        subscription = Subscription.objects.filter(id=subscription_id).first()
-        token = Token.objects.get(key=request.auth.key)
+        fields = SubscriptionSerializer.parse_fields(request.query_params.get('fields'))
+        expand, select_related = SubscriptionSerializer.parse_expand(request.query_params.get('expand'), fields)
+        subscription = SubscriptionSerializer.only(Subscription.objects.filter(id=subscription_id).select_related(*select_related), fields).first()
         if subscription is None:
             return Response(data={"message": f"No subscription found against id {subscription_id}."}, status=status.HTTP_404_NOT_FOUND)
-        if subscription.user_id != token.user_id:
+        if subscription.user_id != request.user.id:
             return Response(data={"message": f"User is not authorized to retrieve subscription having id {subscription_id}."},status=status.HTTP_403_FORBIDDEN)
-        return Response(data=SubscriptionSerializer(subscription).data)
+        validators = object_validators(request, subscription, expand)
+        return not_modified(request, validators) or set_validators(Response(data=SubscriptionSerializer(subscription, expand=expand, fields=fields).data), validators)
 
     def create(self, request, *args, **kwargs):
         # active user id
-        request.data['user'] = Token.objects.get(key=request.auth.key).user_id
+        request.data['user'] = request.user.id
         serializer = self.serializer_class(
             data=request.data, context={"request": request}
         )
@@ -140,12 +323,11 @@ class SubscriptionViewSet(ModelViewSet):
     def update(self, request, *args, **kwargs):
         subscription_id = kwargs['pk']
         subscription = Subscription.objects.filter(id=subscription_id).first()
-        token = Token.objects.get(key=request.auth.key)
         if subscription is None:
             return Response(data={"message": f"No subscription found against id {subscription_id}."}, status=status.HTTP_404_NOT_FOUND)
-        if subscription.user_id != token.user_id:
+        if subscription.user_id != request.user.id:
             return Response(data={"message": f"User is not authorized to update subscription having id {subscription_id}."}, status=status.HTTP_403_FORBIDDEN)
-        request.data['user'] = token.user_id
+        request.data['user'] = request.user.id
         serializer = self.serializer_class(
             data=request.data, context={"request": request}
         )
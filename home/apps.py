@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class HomeConfig(AppConfig):
     name = 'home'
+
+    def ready(self):
+        import home.signals  # noqa
@@ -0,0 +1,52 @@
+"""
+Micro benchmarks run with `manage.py benchmark <name>`.
+
+Each benchmark is a function registered with `@benchmark`, it receives the
+parsed command options and returns a dict of results. Benchmarks seed their
+own data inside a transaction that is rolled back afterwards, or in a
+throwaway database when their requests must be served by other threads.
+
+A benchmark registered with a `compare` function can be checked against a
+saved baseline with `--compare`, the function gets (baseline, results,
+threshold) and returns the regressions found.
+"""
+import time
+from importlib import import_module
+
+BENCHMARK_MODULES = [
+    "home.benchmarks.connections",
+    "home.benchmarks.endpoints",
+    "home.benchmarks.export",
+    "home.benchmarks.instrumentation",
+    "home.benchmarks.options",
+    "home.benchmarks.serializers",
+    "home.benchmarks.signup",
+]
+
+registry = {}
+comparisons = {}
+
+
+def benchmark(name, compare=None):
+    def register(func):
+        registry[name] = func
+        if compare is not None:
+            comparisons[name] = compare
+        return func
+    return register
+
+
+def load():
+    for module in BENCHMARK_MODULES:
+        import_module(module)
+    return registry
+
+
+def best_of(func, repeat):
+    # Best wall clock time in seconds, the least noisy estimate of the cost
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
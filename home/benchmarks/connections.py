@@ -0,0 +1,51 @@
+import copy
+
+from django.db import connection
+from django.db.utils import load_backend
+
+from backend_app_32996.db import pool as db_pool
+from home.benchmarks import benchmark, best_of
+
+REQUESTS = 200
+
+
+@benchmark("connections")
+def measure_connection_pool(options):
+    """Connect, query and close as a request does with CONN_MAX_AGE=0, with and without the pool."""
+    settings_dict = copy.deepcopy(connection.settings_dict)
+    wrapper_class = load_backend(settings_dict["ENGINE"]).DatabaseWrapper
+    if issubclass(wrapper_class, db_pool.PooledDatabaseWrapperMixin):
+        unpooled_class = next(base for base in wrapper_class.__mro__[1:] if base.__module__.startswith("django.db.backends"))
+        pooled_class = wrapper_class
+    else:
+        unpooled_class, pooled_class = wrapper_class, db_pool.pooled(wrapper_class)
+
+    def run(wrapper):
+        def requests():
+            for _ in range(REQUESTS):
+                with wrapper.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                wrapper.close()
+        return requests
+
+    unpooled = unpooled_class(settings_dict, alias="benchmark")
+    pooled = pooled_class(settings_dict, alias="benchmark")
+    try:
+        results = {"unpooled": float("inf"), "pooled": float("inf")}
+        for round in range(options["repeat"]):
+            # Alternating order, so both see the same noise
+            for name, wrapper in sorted({"unpooled": unpooled, "pooled": pooled}.items(), reverse=round % 2 == 1):
+                results[name] = min(results[name], best_of(run(wrapper), 1) / REQUESTS)
+        stats = [stats for stats in db_pool.stats() if stats["alias"] == "benchmark"][0]
+    finally:
+        unpooled.close()
+        pooled.close()
+        db_pool.close_pools("benchmark")
+
+    return {
+        "database": connection.vendor,
+        "unpooled_ms_per_request": results["unpooled"] * 1000,
+        "pooled_ms_per_request": results["pooled"] * 1000,
+        "saved_ms_per_request": (results["unpooled"] - results["pooled"]) * 1000,
+        "pool": stats,
+    }
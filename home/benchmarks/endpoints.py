@@ -0,0 +1,230 @@
+import http.client
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+
+from home import seeding
+from home.benchmarks import benchmark
+from home.constants import APP_CHOICES_LIST, FRAMEWORK_CHOICES_LIST
+from home.instrumentation import percentile
+from home.models import App, Plan, Subscription
+
+SCALES = {"1k": 1000, "100k": 100000, "1M": 1000000}
+PASSWORD = "benchmark-password"
+# Mean apps per seeded user
+APPS_PER_USER = 10
+
+
+@contextmanager
+def benchmark_database():
+    # Seeded rows are committed, so that the server threads see them, in a throwaway database
+    old_name = connection.settings_dict["NAME"]
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    old_test_name = test_settings.get("NAME")
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite" and not old_test_name:
+            # In-memory SQLite databases can't be shared with the server threads
+            test_settings["NAME"] = os.path.join(directory, "benchmark.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings["NAME"] = old_test_name
+
+
+def seed(rows):
+    """
+    About `rows` apps with their subscriptions over rows / APPS_PER_USER users, as
+    `seed_load_data` generates them. Returns the user with the most apps.
+    """
+    seeding.seed(max(1, rows // APPS_PER_USER), apps_per_user=APPS_PER_USER, password=PASSWORD, prefix="bench")
+    return get_user_model().objects.annotate(apps=Count("app")).order_by("-apps", "id").first()
+
+
+class ClientTransport:
+    """Requests through django.test.Client, the handler without any server."""
+
+    name = "client"
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, body=None, token=None):
+        extra = {"HTTP_AUTHORIZATION": f"Token {token}"} if token else {}
+        data = json.dumps(body) if body is not None else ""
+        response = self.client.generic(method, path, data, content_type="application/json", **extra)
+        return response.status_code, response.content
+
+    def close(self):
+        pass
+
+
+class WSGITransport:
+    """Requests over a keep-alive HTTP connection to a local waitress server, as in the Dockerfile."""
+
+    name = "wsgi"
+
+    def __init__(self):
+        from waitress.server import create_server
+
+        self.server = create_server(get_wsgi_application(), host="127.0.0.1", port=0)
+        threading.Thread(target=self.server.run, daemon=True).start()
+        self.connection = http.client.HTTPConnection("127.0.0.1", self.server.effective_port)
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Token {token}"
+        self.connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def close(self):
+        self.connection.close()
+        self.server.close()
+
+
+TRANSPORTS = {transport.name: transport for transport in (ClientTransport, WSGITransport)}
+
+
+def app_body(i):
+    return {
+        "name": f"benchmark app {i}",
+        "description": "Created by the endpoints benchmark",
+        "type": APP_CHOICES_LIST[i % len(APP_CHOICES_LIST)],
+        "framework": FRAMEWORK_CHOICES_LIST[i % len(FRAMEWORK_CHOICES_LIST)],
+    }
+
+
+def flows(state):
+    """(scenario, request(i) -> (method, path, body), response handler or None), in the order they run.
+
+    The apps and subscriptions created along the way are deleted by the last
+    flow, so every transport runs against the same seeded data.
+    """
+    apps, subscriptions, plans = state["apps"], state["subscriptions"], state["plans"]
+    created_apps, created_subscriptions = state["created_apps"], state["created_subscriptions"]
+
+    def created(target):
+        return lambda content: target.append(json.loads(content))
+
+    return [
+        ("login", lambda i: ("POST", "/api/v1/login/", {"username": state["username"], "password": PASSWORD}), None),
+        ("app_list", lambda i: ("GET", "/api/v1/apps/", None), None),
+        ("app_detail", lambda i: ("GET", f"/api/v1/apps/{apps[i % len(apps)]}/", None), None),
+        ("app_create", lambda i: ("POST", "/api/v1/apps/", app_body(i)), created(created_apps)),
+        ("app_update", lambda i: (
+            "PUT", f"/api/v1/apps/{created_apps[i % len(created_apps)]['id']}/", app_body(i + 1)
+        ), None),
+        ("subscription_list", lambda i: ("GET", "/api/v1/subscriptions/", None), None),
+        ("subscription_detail", lambda i: (
+            "GET", f"/api/v1/subscriptions/{subscriptions[i % len(subscriptions)]}/", None
+        ), None),
+        ("subscription_create", lambda i: ("POST", "/api/v1/subscriptions/", {
+            "plan": plans[i % len(plans)], "app": created_apps[i % len(created_apps)]["id"], "active": True,
+        }), created(created_subscriptions)),
+        ("subscription_update", lambda i: (
+            "PUT", f"/api/v1/subscriptions/{created_subscriptions[i % len(created_subscriptions)]['id']}/", {
+                "plan": plans[(i + 1) % len(plans)],
+                "app": created_subscriptions[i % len(created_subscriptions)]["app"],
+                "active": True,
+            }
+        ), None),
+        ("app_delete", lambda i: ("DELETE", f"/api/v1/apps/{created_apps.pop()['id'] if created_apps else 0}/", None), None),
+    ]
+
+
+def summarize(timings, errors, elapsed):
+    ordered = sorted(timings)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": len(ordered) / elapsed,
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": percentile(ordered, 0.5) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+    }
+
+
+def run_transport(transport, state, requests):
+    results = {}
+    state = dict(state, created_apps=[], created_subscriptions=[])
+    # The first request loads the middleware and urlconf, keep it out of the timings
+    transport.request("GET", "/api/v1/plans/", token=state["token"])
+    for scenario, make_request, handle_response in flows(state):
+        timings, errors = [], 0
+        started = time.perf_counter()
+        for i in range(requests):
+            method, path, body = make_request(i)
+            request_started = time.perf_counter()
+            status, content = transport.request(method, path, body, token=None if scenario == "login" else state["token"])
+            timings.append(time.perf_counter() - request_started)
+            if status >= 400:
+                errors += 1
+            elif handle_response is not None:
+                handle_response(content)
+        results[scenario] = summarize(timings, errors, time.perf_counter() - started)
+    return results
+
+
+def find_regressions(baseline, current, threshold):
+    """p95 latency up or throughput down by more than `threshold` (a fraction) against the baseline."""
+    regressions = []
+    for transport, scenarios in current["transports"].items():
+        for scenario, result in scenarios.items():
+            before = baseline.get("transports", {}).get(transport, {}).get(scenario)
+            if before is None:
+                continue
+            if result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(f"{transport} {scenario}: p95 {before['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms")
+            if result["throughput_rps"] < before["throughput_rps"] * (1 - threshold):
+                regressions.append(
+                    f"{transport} {scenario}: throughput {before['throughput_rps']:.1f}/s -> {result['throughput_rps']:.1f}/s"
+                )
+    return regressions
+
+
+@benchmark("endpoints", compare=find_regressions)
+def measure_endpoints(options):
+    """Latency percentiles and throughput of the login, app and subscription flows over seeded data."""
+    rows = SCALES[options["scale"]] if options.get("scale") else options["rows"]
+    transports = [options["transport"]] if options.get("transport") else sorted(TRANSPORTS)
+    with benchmark_database():
+        started = time.perf_counter()
+        user = seed(rows)
+        seed_seconds = time.perf_counter() - started
+
+        _, content = ClientTransport().request("POST", "/api/v1/login/", {"username": user.username, "password": PASSWORD})
+        state = {
+            "username": user.username,
+            "token": json.loads(content)["token"],
+            "apps": list(App.objects.filter(user=user).values_list("id", flat=True)),
+            "subscriptions": list(Subscription.objects.filter(user=user).values_list("id", flat=True)),
+            "plans": list(Plan.objects.values_list("id", flat=True)),
+        }
+        results = {}
+        for name in transports:
+            transport = TRANSPORTS[name]()
+            try:
+                results[name] = run_transport(transport, state, options["requests"])
+            finally:
+                transport.close()
+
+    return {
+        "rows": rows,
+        "database": connection.vendor,
+        "seed_seconds": seed_seconds,
+        "requests_per_scenario": options["requests"],
+        "transports": results,
+    }
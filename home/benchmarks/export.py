@@ -0,0 +1,72 @@
+import os
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from home.benchmarks import benchmark
+from home.models import App, Plan, Subscription
+
+
+@benchmark("export")
+def measure_export(options):
+    """Time to first byte, total time and peak memory of /api/v1/export/ at two tenant sizes."""
+    results = []
+    for rows in (max(options["rows"] // 10, 1), options["rows"]):
+        with transaction.atomic():
+            results.append(dict(rows=rows, **stream_export(seed(rows))))
+            transaction.set_rollback(True)
+    return {"runs": results}
+
+
+def rss_kb():
+    """Current resident set size of the process, None where /proc isn't available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return None
+
+
+def seed(rows):
+    user = get_user_model().objects.create(username="benchmark_user")
+    plan = Plan.objects.get_or_create(id=1, defaults={"name": "Free", "description": "Free plan"})[0]
+    App.objects.bulk_create(
+        [App(name=f"app {i}", type="Web", framework="Django", description="d" * 200, user=user) for i in range(rows)]
+    )
+    Subscription.objects.bulk_create([
+        Subscription(user=user, plan=plan, app_id=app_id, active=False)
+        for app_id in App.objects.filter(user=user).values_list("id", flat=True)
+    ])
+    return Token.objects.create(user=user)
+
+
+def stream_export(token):
+    # Timed and memory-traced in separate passes, tracemalloc slows everything down
+    client = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+    started = time.perf_counter()
+    content = iter(client.get("/api/v1/export/").streaming_content)
+    size = len(next(content))
+    first_byte = time.perf_counter() - started
+    for chunk in content:
+        size += len(chunk)
+    total = time.perf_counter() - started
+
+    # ru_maxrss would include the seeding, sample the RSS around and during the stream instead
+    tracemalloc.start()
+    before = peak_rss = rss_kb()
+    for chunk in client.get("/api/v1/export/").streaming_content:
+        if before is not None:
+            peak_rss = max(peak_rss, rss_kb())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "first_byte_seconds": first_byte,
+        "total_seconds": total,
+        "bytes": size,
+        "peak_python_memory_kb": peak // 1024,
+        "rss_growth_kb": None if before is None else peak_rss - before,
+    }
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import Client, override_settings
+from rest_framework.authtoken.models import Token
+
+from home.benchmarks import benchmark, best_of
+from home.instrumentation import route_stats
+from home.models import App
+
+REQUESTS = 200
+# Every request goes through the view, not the response cache
+DUMMY_CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+@benchmark("instrumentation")
+def measure_instrumentation_overhead(options):
+    """Cost of PerformanceMiddleware on /api/v1/apps/ requests, timed against untimed."""
+    with transaction.atomic(), override_settings(CACHES=DUMMY_CACHES):
+        user = get_user_model().objects.create(username="benchmark_user")
+        App.objects.bulk_create([
+            App(name=f"app {i}", type="Web", framework="Django", user=user) for i in range(min(options["rows"], 50))
+        ])
+        token = Token.objects.create(user=user)
+        clients = {}
+        for name, sample_rate in (("untimed", 0), ("timed", 1)):
+            # The middleware reads the setting when the client loads it, on the first request
+            with override_settings(PERF_SAMPLE_RATE=sample_rate):
+                clients[name] = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+                clients[name].get("/api/v1/apps/")
+
+        def run(client):
+            return lambda: [client.get("/api/v1/apps/") for _ in range(REQUESTS)]
+
+        # Interleaved rounds in alternating order, so both modes see the same noise
+        results = {"untimed": float("inf"), "timed": float("inf")}
+        for round in range(options["repeat"]):
+            for name, client in sorted(clients.items(), reverse=round % 2 == 1):
+                results[name] = min(results[name], best_of(run(client), 1) / REQUESTS)
+        transaction.set_rollback(True)
+    route_stats.clear()
+
+    return {
+        "untimed_ms_per_request": results["untimed"] * 1000,
+        "timed_ms_per_request": results["timed"] * 1000,
+        "overhead_percent": (results["timed"] / results["untimed"] - 1) * 100,
+    }
@@ -0,0 +1,60 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+import types
+
+from home.benchmarks import benchmark, best_of
+from modules.utils import OptionsStore
+
+
+def read_options_file(path, module_slug, option_key):
+    # get_options as it was: parse the file and scan it on every call
+    with open(path, "r") as f:
+        module_options = json.loads(f.read())
+
+    option_value = [
+        module.get(option_key)
+        for module in module_options["module_options"]
+        if module.get("slug") == module_slug
+    ]
+
+    default_value = getattr(
+        importlib.import_module(f"modules.{module_slug}.options"), option_key
+    )
+
+    return option_value[0] if option_value else default_value
+
+
+@benchmark("options")
+def compare_options_lookups(options):
+    """Lookups per second of the file-parsing get_options against OptionsStore."""
+    modules = max(options["rows"] // 100, 1)
+    lookups = 1000
+    slugs = [f"bench_{i}" for i in range(modules)]
+    for slug in slugs:
+        sys.modules[f"modules.{slug}.options"] = types.SimpleNamespace(color="red", size="large")
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        # Half the modules override their defaults
+        json.dump({"module_options": [{"slug": slug, "color": "blue"} for slug in slugs[::2]]}, f)
+    try:
+        keys = [(slugs[i % modules], "color" if i % 3 else "size") for i in range(lookups)]
+        store = OptionsStore(f.name)
+
+        def run(get):
+            return lambda: [get(slug, key) for slug, key in keys]
+
+        parsing = best_of(run(lambda slug, key: read_options_file(f.name, slug, key)), options["repeat"])
+        memoized = best_of(run(store.get), options["repeat"])
+    finally:
+        os.unlink(f.name)
+        for slug in slugs:
+            del sys.modules[f"modules.{slug}.options"]
+
+    return {
+        "modules": modules,
+        "parsing_lookups_per_second": lookups / parsing,
+        "store_lookups_per_second": lookups / memoized,
+        "speedup": parsing / memoized,
+    }
@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from home.api.v1.fast_serializers import AppValuesSerializer
+from home.api.v1.serializers import AppSerializer
+from home.benchmarks import benchmark, best_of
+from home.models import App
+
+
+@benchmark("serializers")
+def compare_app_serializers(options):
+    """AppSerializer(many=True) against AppValuesSerializer over the same rows."""
+    rows = options["rows"]
+    with transaction.atomic():
+        user = get_user_model().objects.create(username="benchmark_user")
+        App.objects.bulk_create([
+            App(name=f"app {i}", type="Web", framework="Django", description="d" * 200, user=user)
+            for i in range(rows)
+        ])
+        queryset = App.objects.filter(user=user).order_by("created_at", "id")
+        values_serializer = AppValuesSerializer()
+
+        model_serializer = best_of(lambda: AppSerializer(queryset.all(), many=True).data, options["repeat"])
+        values = best_of(lambda: values_serializer.to_representation(values_serializer.values(queryset.all())), options["repeat"])
+        transaction.set_rollback(True)
+
+    return {
+        "rows": rows,
+        "model_serializer_seconds": model_serializer,
+        "values_serializer_seconds": values,
+        "speedup": model_serializer / values,
+    }
@@ -0,0 +1,84 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from allauth.utils import generate_unique_username
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, connection, connections
+from django.test.utils import CaptureQueriesContext
+
+from home.benchmarks import benchmark
+from home.benchmarks.endpoints import benchmark_database
+from home.usernames import save_with_unique_username
+
+SIGNUPS = 50
+THREADS = 8
+# Every signup asks for the same name, the seeded users already hold the plain one and many suffixed ones
+NAME = "John Smith"
+
+
+def allauth_signup(user):
+    # What SignupSerializer.create did before
+    user.username = generate_unique_username([user.name, user.email, "user"])
+    user.save()
+
+
+def single_query_signup(user):
+    save_with_unique_username(user, [user.name, user.email, "user"])
+
+
+def new_user(password, i):
+    return get_user_model()(name=NAME, email=f"john.smith.{time.monotonic_ns()}.{i}@example.com", password=password)
+
+
+def run(signup, password, threads):
+    """ms per signup, queries per signup (of the first thread) and signups that failed on a taken username."""
+    failures = []
+    queries = []
+
+    def signups(thread):
+        try:
+            with CaptureQueriesContext(connections["default"]) as captured:
+                for i in range(SIGNUPS):
+                    try:
+                        signup(new_user(password, i))
+                    except IntegrityError:
+                        failures.append(thread)
+            if thread == 0:
+                queries.append(len(captured))
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(signups, range(threads)))
+    elapsed = time.perf_counter() - started
+    return {
+        "ms_per_signup": elapsed / (SIGNUPS * threads) * 1000,
+        "queries_per_signup": queries[0] / SIGNUPS,
+        "failed_signups": len(failures),
+    }
+
+
+@benchmark("signup")
+def measure_signup_usernames(options):
+    """Concurrent signups with colliding names, allauth's generate_unique_username against one IN query and retries."""
+    password = make_password("benchmark-password")
+    User = get_user_model()
+    if connection.vendor == "sqlite":
+        # Writers queue on the database lock, give the threads time to take turns
+        connection.settings_dict["OPTIONS"].setdefault("timeout", 60)
+    with benchmark_database():
+        User.objects.bulk_create(
+            [User(username="john_smith", email="john.smith@example.com", password=password)]
+            + [User(username=f"john_smith{i}", email=f"john.smith{i}@example.com", password=password) for i in range(options["rows"])]
+        )
+        results = {}
+        for name, signup in (("allauth", allauth_signup), ("single_query", single_query_signup)):
+            results[name] = {
+                "sequential": run(signup, password, 1),
+                "concurrent": run(signup, password, THREADS),
+            }
+        results["database"] = connection.vendor
+        results["seeded_users"] = options["rows"] + 1
+    return results
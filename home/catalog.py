@@ -0,0 +1,61 @@
+import hashlib
+import json
+
+from django.conf import settings
+
+from home.models import Plan
+from home.tiered_cache import TwoTierCache
+
+
+class PlanCatalog:
+    """
+    Copy of the Plan table with the API payloads pre-rendered, held in a
+    `TwoTierCache` so every worker reads it from memory.
+
+    The table only changes when plan_data.yaml is loaded or a plan is edited in
+    the admin, both call `invalidate()` through the signal handlers in
+    `home.signals`, which also drops the copies of the other workers.
+    """
+    key = "catalog"
+
+    def __init__(self):
+        self._cache = TwoTierCache(
+            "plans",
+            max_size=1,
+            local_ttl=getattr(settings, "PLAN_CATALOG_LOCAL_TTL", 300),
+            shared_ttl=getattr(settings, "PLAN_CATALOG_SHARED_TTL", 3600),
+        )
+
+    def invalidate(self):
+        self._cache.delete(self.key)
+
+    def list(self):
+        return self._load()["list"]
+
+    def payload(self, plan_id):
+        return self._load()["payloads"].get(plan_id)
+
+    def get(self, plan_id):
+        return self._load()["plans"].get(plan_id)
+
+    def version(self):
+        """Digest of the payloads, the same in every worker until a plan changes."""
+        return self._load()["version"]
+
+    def _load(self):
+        return self._cache.get_or_set(self.key, self._build)
+
+    def _build(self):
+        from home.api.v1.serializers import PlanSerializer
+
+        plans = list(Plan.objects.order_by("id"))
+        payloads = [dict(payload) for payload in PlanSerializer(plans, many=True).data]
+        return {
+            "plans": {plan.id: plan for plan in plans},
+            "payloads": {payload["id"]: payload for payload in payloads},
+            "list": payloads,
+            "version": hashlib.md5(json.dumps(payloads, sort_keys=True, default=str).encode()).hexdigest(),
+        }
+
+
+plan_catalog = PlanCatalog()
@@ -0,0 +1,121 @@
+"""
+Outgoing mail queued in the database and sent outside the request.
+
+`QueuedEmailBackend` is the EMAIL_BACKEND: sending a message only inserts a
+`QueuedEmail` row, in the caller's transaction when there is one. The signup
+and password reset endpoints run in a transaction, their mail is dropped with
+the rest of their writes when they fail. `manage.py send_queued_email` runs an
+`EmailQueueWorker` that sends the due messages in batches over one
+EMAIL_DELIVERY_BACKEND connection (SMTP in production, locmem in the tests).
+A failed message is retried with exponential backoff until it runs out of
+attempts.
+
+A batch is claimed in a short transaction that moves its messages
+`claim_timeout` seconds into the future, then sent with no transaction or lock
+held, the result of every message is saved as soon as it is known. A worker
+that dies mid-batch leaves its unsent messages to be claimed again once the
+claim expires.
+"""
+import pickle
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection as db_connection, transaction
+from django.utils import timezone
+
+from home.models import QueuedEmail
+
+# Upper bound of the delay between two attempts, in seconds
+MAX_BACKOFF = 3600
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        emails = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            # The connection of the request isn't the one the worker sends with
+            connection, message.connection = message.connection, None
+            try:
+                payload = pickle.dumps(message)
+            finally:
+                message.connection = connection
+            emails.append(QueuedEmail(
+                message=payload, subject=str(message.subject), recipients=", ".join(message.recipients())
+            ))
+        try:
+            QueuedEmail.objects.bulk_create(emails)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(emails)
+
+
+def backoff_delay(attempts, backoff):
+    return timedelta(seconds=min(backoff * 2 ** (attempts - 1), MAX_BACKOFF))
+
+
+class EmailQueueWorker:
+    def __init__(self, batch_size=100, max_attempts=5, backoff=60, backend=None, claim_timeout=600):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backend = backend or getattr(settings, "EMAIL_DELIVERY_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+        self.claim_timeout = claim_timeout
+
+    def drain(self):
+        """Send batches over one connection until no message is due, returns the sent, retried and failed counts."""
+        totals = {"sent": 0, "retried": 0, "failed": 0}
+        connection = get_connection(self.backend, fail_silently=False)
+        try:
+            while True:
+                counts = self.send_batch(connection)
+                for name, count in counts.items():
+                    totals[name] += count
+                if sum(counts.values()) < self.batch_size:
+                    return totals
+        finally:
+            connection.close()
+
+    def claim(self):
+        """The next due messages, their attempt counted and held back from other workers until the claim expires."""
+        now = timezone.now()
+        with transaction.atomic():
+            due = QueuedEmail.objects.filter(status=QueuedEmail.PENDING, next_attempt_at__lte=now)
+            if db_connection.features.has_select_for_update_skip_locked:
+                # Other workers skip the batch this one is claiming
+                due = due.select_for_update(skip_locked=True)
+            batch = list(due.order_by("next_attempt_at", "id")[:self.batch_size])
+            for email in batch:
+                email.attempts += 1
+                email.next_attempt_at = now + timedelta(seconds=self.claim_timeout)
+            QueuedEmail.objects.bulk_update(batch, ["attempts", "next_attempt_at"])
+        return batch
+
+    def send_batch(self, connection):
+        counts = {"sent": 0, "retried": 0, "failed": 0}
+        for email in self.claim():
+            try:
+                # Opens the connection on the first message and after an error, a no-op otherwise
+                connection.open()
+                connection.send_messages([pickle.loads(bytes(email.message))])
+            except Exception as error:
+                # The connection may be broken, the next message reconnects
+                connection.close()
+                email.last_error = f"{type(error).__name__}: {error}"
+                if email.attempts >= self.max_attempts:
+                    email.status = QueuedEmail.FAILED
+                    counts["failed"] += 1
+                else:
+                    email.next_attempt_at = timezone.now() + backoff_delay(email.attempts, self.backoff)
+                    counts["retried"] += 1
+            else:
+                email.status = QueuedEmail.SENT
+                email.sent_at = timezone.now()
+                counts["sent"] += 1
+            email.save(update_fields=["status", "next_attempt_at", "last_error", "sent_at"])
+        return counts
@@ -0,0 +1,173 @@
+"""
+Per-request timings: DB queries, authentication, serialization and view time.
+
+`PerformanceMiddleware` samples PERF_SAMPLE_RATE of the requests. For those it
+installs an `execute_wrapper` on every database connection and makes the
+request's `RequestMetrics` current, the API viewsets and serializers add their
+sections to it through `timed()`. The timings are kept in a rolling window
+per route, summarized as percentiles by `route_stats.summary()`, and sent back
+in a `Server-Timing` header to staff users, or to everyone when DEBUG is on.
+"""
+import contextvars
+import functools
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.sections = defaultdict(float)
+        self._depth = defaultdict(int)
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sections["db"] += time.perf_counter() - started
+            self.queries += 1
+
+    def enter(self, section):
+        # Only the outermost of nested sections (e.g. expanded serializers) is timed
+        self._depth[section] += 1
+        return self._depth[section] == 1
+
+    def leave(self, section, elapsed):
+        self._depth[section] -= 1
+        if elapsed is not None:
+            self.sections[section] += elapsed
+
+
+def timed(section):
+    """Add the time spent in the decorated function to `section` of the current request."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = _current.get()
+            if metrics is None:
+                return func(*args, **kwargs)
+            outermost = metrics.enter(section)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.leave(section, time.perf_counter() - started if outermost else None)
+        return wrapper
+    return decorator
+
+
+def percentile(ordered, fraction):
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class RouteStats:
+    """Last `window` (total, db, queries) samples of every route."""
+
+    def __init__(self, window):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, total, db, queries):
+        samples = self._samples.get(route)
+        if samples is None:
+            with self._lock:
+                samples = self._samples.setdefault(route, deque(maxlen=self.window))
+        samples.append((total, db, queries))
+
+    def summary(self):
+        with self._lock:
+            routes = {route: list(samples) for route, samples in self._samples.items()}
+        summary = {}
+        for route, samples in sorted(routes.items()):
+            if not samples:
+                continue
+            totals = sorted(sample[0] for sample in samples)
+            db = sorted(sample[1] for sample in samples)
+            summary[route] = {
+                "count": len(samples),
+                "total_ms": {f"p{int(q * 100)}": percentile(totals, q) * 1000 for q in (0.5, 0.95, 0.99)},
+                "db_ms": {f"p{int(q * 100)}": percentile(db, q) * 1000 for q in (0.5, 0.95, 0.99)},
+                "mean_queries": sum(sample[2] for sample in samples) / len(samples),
+            }
+        return summary
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+
+route_stats = RouteStats(getattr(settings, "PERF_WINDOW_SIZE", 1000))
+
+
+class PerformanceMiddleware:
+    """Keep it first in MIDDLEWARE, so `total` covers the other middleware too."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PERF_SAMPLE_RATE", 0.01)
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.execute))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        route = f"{request.method} {match.route if match is not None else '<unresolved>'}"
+        route_stats.record(route, total, metrics.sections["db"], metrics.queries)
+        if self.exposed_to(request):
+            response["Server-Timing"] = self.server_timing(metrics, total)
+        return response
+
+    def exposed_to(self, request):
+        # Query counts and timings are internals. Set by the DRF authentication of the
+        # view, with a cached token is_staff costs one query, after the timed section.
+        return settings.DEBUG or getattr(getattr(request, "user", None), "is_staff", False)
+
+    def server_timing(self, metrics, total):
+        entries = [f'db;dur={metrics.sections["db"] * 1000:.3f};desc="{metrics.queries} queries"']
+        for section in ("auth", "serialize", "view"):
+            if section in metrics.sections:
+                entries.append(f"{section};dur={metrics.sections[section] * 1000:.3f}")
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+
+class InstrumentedViewMixin:
+    """APIView mixin adding the view and authentication time to the current request."""
+
+    @timed("view")
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+    @timed("auth")
+    def perform_authentication(self, request):
+        super().perform_authentication(request)
+
+
+class InstrumentedSerializerMixin:
+    """Serializer mixin adding the time spent in to_representation to the current request."""
+
+    @timed("serialize")
+    def to_representation(self, instance):
+        return super().to_representation(instance)
@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from home import benchmarks
+from home.benchmarks.endpoints import SCALES, TRANSPORTS
+
+
+class Command(BaseCommand):
+    help = "Run one of the micro benchmarks registered in home.benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", help="Benchmark to run, see --list.", nargs="?")
+        parser.add_argument("--list", action="store_true", default=False, help="List the available benchmarks.")
+        parser.add_argument("--rows", type=int, default=10000, help="Number of rows to seed.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the best one is kept.")
+        parser.add_argument("--scale", choices=list(SCALES), help="Seeded rows of the endpoints benchmark, overrides --rows.")
+        parser.add_argument("--transport", choices=sorted(TRANSPORTS), help="Only run the endpoints benchmark over this transport.")
+        parser.add_argument("--requests", type=int, default=100, help="Requests per scenario of the endpoints benchmark.")
+        parser.add_argument("--output", help="Also write the results to this file, to be used as a baseline.")
+        parser.add_argument("--compare", metavar="BASELINE", help="Fail if the results regressed against this baseline file.")
+        parser.add_argument(
+            "--threshold", type=float, default=20,
+            help="Percentage a measurement may regress against the baseline before failing.",
+        )
+
+    def handle(self, *args, **options):
+        registry = benchmarks.load()
+        if options["list"] or not options["name"]:
+            for name, func in sorted(registry.items()):
+                self.stdout.write(f"{name}: {func.__doc__ or ''}")
+            return
+        name = options["name"]
+        if name not in registry:
+            raise CommandError(f"Unknown benchmark {name}, valid values are {sorted(registry)}")
+        if options["compare"] and name not in benchmarks.comparisons:
+            raise CommandError(f"Benchmark {name} can't be compared against a baseline")
+        baseline = None
+        if options["compare"]:
+            # Read before running, a missing baseline shouldn't cost a whole run
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+
+        results = json.dumps(registry[name](options), indent=2)
+        self.stdout.write(results)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(results)
+
+        if baseline is not None:
+            regressions = benchmarks.comparisons[name](baseline, json.loads(results), options["threshold"] / 100)
+            if regressions:
+                raise CommandError("Regressed against the baseline:\n" + "\n".join(regressions))
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from home.models import App, Plan, Subscription
+
+# Plan fragments meaning the whole table is read
+FULL_SCAN_MARKERS = ("Seq Scan", "SCAN TABLE", "SCAN home_")
+
+
+class Command(BaseCommand):
+    help = "Print the EXPLAIN plan of every query issued by the API viewsets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", dest="user_id", type=int, default=None,
+            help="Id of the user whose data is queried, defaults to the user owning the most apps.",
+        )
+        parser.add_argument(
+            "--analyze", action="store_true", default=False,
+            help="Run EXPLAIN ANALYZE (PostgreSQL only), this executes the queries.",
+        )
+
+    def handle(self, *args, **options):
+        user_id = options["user_id"] or self.busiest_user_id()
+        app = App.objects.filter(user=user_id).order_by("-created_at", "-id").first()
+        app_id = app.id if app else 0
+        cursor = app.created_at if app else timezone.now()
+        subscription = Subscription.objects.filter(user=user_id).order_by("-created_at", "-id").first()
+        subscription_id = subscription.id if subscription else 0
+        subscription_cursor = subscription.created_at if subscription else timezone.now()
+        page_size = settings.API_PAGE_SIZE + 1
+        explain_options = {"analyze": True} if options["analyze"] and connection.vendor == "postgresql" else {}
+
+        queries = [
+            ("app list", App.objects.filter(user=user_id).order_by("created_at", "id")[:page_size]),
+            ("app list, deep page", App.objects.filter(user=user_id, created_at__gte=cursor).filter(
+                Q(created_at__gt=cursor) | Q(id__gt=app_id)).order_by("created_at", "id")[:page_size]),
+            ("app detail", App.objects.filter(id=app_id)),
+            ("subscription list", Subscription.objects.filter(user=user_id).order_by("created_at", "id")[:page_size]),
+            ("subscription list, deep page", Subscription.objects.filter(
+                user=user_id, created_at__gte=subscription_cursor).filter(
+                Q(created_at__gt=subscription_cursor) | Q(id__gt=subscription_id)).order_by("created_at", "id")[:page_size]),
+            ("subscription detail", Subscription.objects.filter(id=subscription_id)),
+            ("active subscriptions of app", Subscription.objects.filter(
+                app_id=subscription.app_id if subscription else app_id, active=True).exclude(pk=subscription_id)),
+            ("plan list", Plan.objects.all()),
+        ]
+
+        self.stdout.write(
+            f"Database: {connection.vendor}, user id: {user_id}, app id: {app_id}, subscription id: {subscription_id}\n"
+        )
+        for name, queryset in queries:
+            plan = queryset.explain(**explain_options)
+            style = self.style.WARNING if any(marker in plan for marker in FULL_SCAN_MARKERS) else self.style.SUCCESS
+            self.stdout.write(style(name))
+            self.stdout.write(plan + "\n")
+
+    def busiest_user_id(self):
+        busiest = (
+            App.objects.exclude(user=None).values("user").annotate(apps=Count("id")).order_by("-apps").first()
+        )
+        return busiest["user"] if busiest else 0
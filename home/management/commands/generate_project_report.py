@@ -1,27 +1,119 @@
+import functools
 import json
-import subprocess
+import re
+import time
 
 import django
+from django.contrib.admindocs.views import simplify_regex
 from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.urls import URLPattern, URLResolver, Resolver404, get_resolver, resolve
+
+# Decorators reported for each view, same as `show_urls`
+REPORTED_DECORATORS = ["login_required"]
+# Placeholders of simplify_regex output, replaced to get a resolvable sample path
+URL_PLACEHOLDER = re.compile(r"<([^>]+)>")
+PLACEHOLDER_SAMPLES = {"format": "json"}
 
 
 class Command(BaseCommand):
     help = "Generate a json with all Models and URLs of the project."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile", action="store_true", default=False,
+            help="Add the resolution time of every URL and the row count of every model.",
+        )
+        parser.add_argument(
+            "--estimate-above", type=int, default=100000,
+            help="On PostgreSQL, report the planner estimate instead of COUNT(*) for tables larger than this.",
+        )
+
     def handle(self, *args, **options):
         models = django.apps.apps.get_models(
             include_auto_created=True, include_swapped=True
         )
-        cmd = "python3 manage.py show_urls --format=json"
-        loc = subprocess.run(cmd, shell=True, stdout=subprocess.PIPE)
-        print(
-            json.dumps(
-                {
-                    "models": [
-                        str(model).split(".")[-1].replace("'", "").strip(">")
-                        for model in models
-                    ],
-                    "urls": json.loads(loc.stdout.decode().strip()),
-                }
-            )
-        )
+        urls = [self.describe_view(callback, pattern, name) for callback, pattern, name in self.walk(get_resolver().url_patterns)]
+        report = {
+            "models": [
+                str(model).split(".")[-1].replace("'", "").strip(">")
+                for model in models
+            ],
+            "urls": urls,
+        }
+        if options["profile"]:
+            for url in urls:
+                url["resolve_seconds"] = self.resolve_seconds(url["url"])
+            report["model_rows"] = {
+                model._meta.label: self.count_rows(model, options["estimate_above"]) for model in models
+            }
+        self.stdout.write(json.dumps(report))
+
+    def walk(self, patterns, base="", namespace=None):
+        """(callback, pattern, name) of every view, in resolution order."""
+        for pattern in patterns:
+            if isinstance(pattern, URLPattern):
+                name = pattern.name
+                if name and namespace:
+                    name = f"{namespace}:{name}"
+                yield pattern.callback, base + str(pattern.pattern), name
+            elif isinstance(pattern, URLResolver):
+                try:
+                    children = pattern.url_patterns
+                except ImportError:
+                    continue
+                if namespace and pattern.namespace:
+                    child_namespace = f"{namespace}:{pattern.namespace}"
+                else:
+                    child_namespace = pattern.namespace or namespace
+                yield from self.walk(children, base + str(pattern.pattern), child_namespace)
+
+    def describe_view(self, func, pattern, name):
+        decorators = [decorator for decorator in REPORTED_DECORATORS if decorator in getattr(func, "__globals__", {})]
+        if isinstance(func, functools.partial):
+            func = func.func
+            decorators.insert(0, "functools.partial")
+        if hasattr(func, "__name__"):
+            func_name = func.__name__
+        elif hasattr(func, "__class__"):
+            func_name = f"{func.__class__.__name__}()"
+        else:
+            func_name = re.sub(r" at 0x[0-9a-f]+", "", repr(func))
+        return {
+            "url": simplify_regex(pattern),
+            "module": f"{func.__module__}.{func_name}",
+            "name": name or "",
+            "decorators": ", ".join(decorators),
+        }
+
+    def resolve_seconds(self, url, repeat=20):
+        # Best time of resolving a sample path of the URL, None if it doesn't resolve
+        path = URL_PLACEHOLDER.sub(lambda match: PLACEHOLDER_SAMPLES.get(match.group(1), "1"), url).replace("\\", "")
+        try:
+            resolve(path)
+        except Resolver404:
+            return None
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            resolve(path)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def count_rows(self, model, estimate_above):
+        if model._meta.swapped or model._meta.proxy or not model._meta.managed:
+            return None
+        try:
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                        [connection.ops.quote_name(model._meta.db_table)],
+                    )
+                    row = cursor.fetchone()
+                # reltuples is -1 (or 0 on older versions) until the table is analyzed
+                if row is not None and row[0] > estimate_above:
+                    return {"rows": row[0], "estimated": True}
+            return {"rows": model._base_manager.count(), "estimated": False}
+        except DatabaseError:
+            return None
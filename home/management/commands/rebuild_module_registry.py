@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from modules import manifest
+
+
+class Command(BaseCommand):
+    help = "Scan the modules/ tree and rewrite the module registry read at boot."
+
+    def handle(self, *args, **options):
+        registry = manifest.rebuild_registry()
+        self.stdout.write(
+            f"Wrote {manifest.REGISTRY_FILE}: {len(registry['apps'])} apps, "
+            f"{len(registry['urls'])} urls, {len(registry['admins'])} admins "
+            f"from {len(registry['directories'])} directories."
+        )
@@ -0,0 +1,53 @@
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from home import seeding
+
+
+class Command(BaseCommand):
+    help = "Seed users, apps, plans and subscriptions in bulk, for load tests against production-sized data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000, help="Number of users to create.")
+        parser.add_argument("--apps-per-user", type=float, default=10, help="Mean number of apps per user.")
+        parser.add_argument("--plans", type=int, default=len(seeding.CATALOG_PLANS), help="Number of plans in the catalog.")
+        parser.add_argument("--password", default="load-test", help="Password of every seeded user.")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Users generated and written per task.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT statement.")
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count(),
+            help="Processes generating and writing chunks, SQLite always uses one.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed, the same seed generates the same data.")
+        parser.add_argument("--prefix", default="load", help="Prefix of the usernames, must not be in use yet.")
+
+    def handle(self, *args, **options):
+        if get_user_model().objects.filter(username__startswith=f"{options['prefix']}_").exists():
+            raise CommandError(f"Users prefixed with {options['prefix']}_ already exist, pick another --prefix")
+        if connection.vendor == "sqlite" and options["workers"] > 1:
+            self.stdout.write("SQLite database, seeding in a single process.")
+        started = time.perf_counter()
+
+        def progress(done, chunks, totals):
+            if options["verbosity"] > 1 or done == chunks:
+                self.stdout.write(
+                    f"{done}/{chunks} chunks: {totals[0]} users, {totals[1]} apps, "
+                    f"{totals[2]} subscriptions in {time.perf_counter() - started:.1f}s"
+                )
+
+        seeding.seed(
+            options["users"],
+            apps_per_user=options["apps_per_user"],
+            plans=options["plans"],
+            password=options["password"],
+            prefix=options["prefix"],
+            random_seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            progress=progress,
+        )
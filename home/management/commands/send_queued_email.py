@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home.email_queue import EmailQueueWorker
+
+
+class Command(BaseCommand):
+    help = "Send the mail queued by home.email_queue.QueuedEmailBackend, until stopped or with --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Messages claimed and sent per batch.")
+        parser.add_argument("--max-attempts", type=int, default=5, help="Attempts before a message is marked failed.")
+        parser.add_argument(
+            "--backoff", type=float, default=60,
+            help="Seconds before the first retry, doubled on every further attempt.",
+        )
+        parser.add_argument(
+            "--claim-timeout", type=float, default=600,
+            help="Seconds a claimed batch is held back from other workers, it must be sent by then.",
+        )
+        parser.add_argument("--interval", type=float, default=5, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", default=False, help="Exit once no message is due.")
+
+    def handle(self, *args, **options):
+        worker = EmailQueueWorker(
+            options["batch_size"], options["max_attempts"], options["backoff"], claim_timeout=options["claim_timeout"]
+        )
+        while True:
+            totals = worker.drain()
+            if any(totals.values()):
+                self.stdout.write(f"{totals['sent']} sent, {totals['retried']} to retry, {totals['failed']} failed")
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
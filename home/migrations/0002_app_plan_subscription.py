@@ -0,0 +1,66 @@
+# Generated by Django 2.2.28 on 2026-10-18 13:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('home', '0001_load_initial_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='App',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('type', models.CharField(choices=[('Web', 'Web'), ('Mobile', 'Mobile')], max_length=6)),
+                ('framework', models.CharField(choices=[('Django', 'Django'), ('React Native', 'React Native')], max_length=12)),
+                ('domain_name', models.CharField(blank=True, max_length=50, null=True)),
+                ('screenshot', models.TextField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='%m/%d/%Y %H:%M:%S')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='%m/%d/%Y %H:%M:%S')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Plan',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=20)),
+                ('description', models.TextField()),
+                ('price', models.CharField(choices=[('$0', 'Free ($0)'), ('$10', 'Standard ($10)'), ('$25', 'Pro ($25)')], default='$0', max_length=7)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='%m/%d/%Y %H:%M:%S')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='%m/%d/%Y %H:%M:%S')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Subscription',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('active', models.BooleanField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='%m/%d/%Y %H:%M:%S')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='%m/%d/%Y %H:%M:%S')),
+                ('app', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='home.App')),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='home.Plan')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='app',
+            name='subscription',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='home.Subscription'),
+        ),
+        migrations.AddField(
+            model_name='app',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.28 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_app_plan_subscription'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='app',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='home_app_user_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='home_sub_user_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.28 on 2026-10-18 13:21
+
+from django.db import migrations, models
+
+
+def deactivate_duplicate_subscriptions(apps, schema_editor):
+    # Concurrent plan changes could leave several active subscriptions per app,
+    # keep only the newest one so the unique constraint can be created
+    Subscription = apps.get_model("home", "Subscription")
+    latest = {}
+    duplicates = []
+    for pk, app_id in Subscription.objects.filter(active=True).order_by("app_id", "-created_at", "-id").values_list("pk", "app_id"):
+        if app_id in latest:
+            duplicates.append(pk)
+        else:
+            latest[app_id] = pk
+    Subscription.objects.filter(pk__in=duplicates).update(active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(deactivate_duplicate_subscriptions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='subscription',
+            constraint=models.UniqueConstraint(condition=models.Q(active=True), fields=('app',), name='home_sub_one_active_per_app'),
+        ),
+    ]
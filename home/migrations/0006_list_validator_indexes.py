@@ -0,0 +1,21 @@
+# Generated by Django 2.2.28 on 2026-10-18 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0005_drop_redundant_user_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='app',
+            index=models.Index(fields=['user', 'updated_at'], name='home_app_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['user', 'updated_at'], name='home_sub_user_updated_idx'),
+        ),
+    ]
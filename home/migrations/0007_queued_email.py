@@ -0,0 +1,33 @@
+# Generated by Django 2.2.28 on 2026-10-18 14:09
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0006_list_validator_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('message', models.BinaryField()),
+                ('subject', models.TextField(blank=True)),
+                ('recipients', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=7)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='%m/%d/%Y %H:%M:%S')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='%m/%d/%Y %H:%M:%S')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='queuedemail',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='home_email_due_idx'),
+        ),
+    ]
@@ -37,10 +37,19 @@ class App(models.Model):
     domain_name = models.CharField(max_length=50, null=True, blank=True)
     screenshot = models.TextField(null=True)
     subscription = models.ForeignKey('Subscription', related_name='+', on_delete=models.SET_NULL,null=True)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
+    # Indexed by the (user, created_at, id) composite index below
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, db_index=False)
     created_at = models.DateTimeField('%m/%d/%Y %H:%M:%S', auto_now_add=True)
     updated_at = models.DateTimeField('%m/%d/%Y %H:%M:%S', auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Per-user listing ordered by the keyset pagination cursor
+            models.Index(fields=['user', 'created_at', 'id'], name='home_app_user_created_id_idx'),
+            # Covers the max(updated_at)/count aggregate behind the list ETag
+            models.Index(fields=['user', 'updated_at'], name='home_app_user_updated_idx'),
+        ]
+
 class Plan(models.Model):
     id = models.IntegerField(primary_key=True)
     name = models.CharField(max_length=20, blank=False)
@@ -57,15 +66,54 @@ class Plan(models.Model):
 
 class Subscription(models.Model):
     id = models.AutoField(primary_key=True)
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Indexed by the (user, created_at, id) composite index below
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     plan = models.ForeignKey(Plan, on_delete=models.CASCADE)
     app = models.ForeignKey(App, related_name='+', on_delete=models.CASCADE)
     active = models.BooleanField(blank=False)
     created_at = models.DateTimeField('%m/%d/%Y %H:%M:%S', auto_now_add=True)
     updated_at = models.DateTimeField('%m/%d/%Y %H:%M:%S', auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Per-user listing ordered by the keyset pagination cursor
+            models.Index(fields=['user', 'created_at', 'id'], name='home_sub_user_created_id_idx'),
+            # Covers the max(updated_at)/count aggregate behind the list ETag
+            models.Index(fields=['user', 'updated_at'], name='home_sub_user_updated_idx'),
+        ]
+        constraints = [
+            # Also serves the active subscription lookup by app in activate_subscription
+            models.UniqueConstraint(fields=['app'], condition=models.Q(active=True), name='home_sub_one_active_per_app'),
+        ]
+
     def save(self, *arg, **kwargs):
-        Subscription.objects.filter(app=self.app_id).update(active=False)
-        super(Subscription, self).save(*arg, **kwargs)
-        self.app.subscription_id = self.id
-        self.app.save()
+        # Deactivating the other subscriptions of the app and pointing the app
+        # at this one is done atomically by the activation service
+        from home.services import activate_subscription
+        activate_subscription(self, *arg, **kwargs)
+
+
+class QueuedEmail(models.Model):
+    # Outgoing mail written by home.email_queue.QueuedEmailBackend and sent by `manage.py send_queued_email`
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (SENT, 'Sent'), (FAILED, 'Failed')]
+
+    id = models.AutoField(primary_key=True)
+    # Pickled EmailMessage, the delivery backend gets the message the request built
+    message = models.BinaryField()
+    subject = models.TextField(blank=True)
+    recipients = models.TextField(blank=True)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField('%m/%d/%Y %H:%M:%S', auto_now_add=True)
+    sent_at = models.DateTimeField('%m/%d/%Y %H:%M:%S', null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's next batch: pending messages that are due, oldest first
+            models.Index(fields=['status', 'next_attempt_at'], name='home_email_due_idx'),
+        ]
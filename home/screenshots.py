@@ -0,0 +1,122 @@
+import hashlib
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from PIL import Image
+
+# Pillow format -> file extension of the stored screenshots
+IMAGE_FORMATS = {"PNG": "png", "JPEG": "jpg", "WEBP": "webp", "GIF": "gif"}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams the uploaded file to a temporary file chunk by chunk and computes its
+    sha256 on the way, so the content address is known without a second read.
+    Files above SCREENSHOT_MAX_UPLOAD_SIZE are skipped and flagged `too_large`.
+    """
+    too_large = False
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.SCREENSHOT_MAX_UPLOAD_SIZE:
+            self.too_large = True
+            raise SkipFile()
+        self.sha256.update(raw_data)
+        super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.sha256.hexdigest()
+        return upload
+
+
+def image_format(upload):
+    """Pillow format of an uploaded image, None when it is not a supported image."""
+    try:
+        with Image.open(upload) as image:
+            image.verify()
+            image_format = image.format
+    except Exception:
+        return None
+    finally:
+        upload.seek(0)
+    return image_format if image_format in IMAGE_FORMATS else None
+
+
+def store_screenshot(upload, image_format):
+    """
+    Save the upload under a name derived from its content and return that name.
+    Uploading the same image again does not write anything.
+    """
+    name = f"screenshots/{upload.sha256}.{IMAGE_FORMATS[image_format]}"
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, upload)
+        if saved != name:
+            # Lost a race against an identical upload, keep the first copy
+            default_storage.delete(saved)
+    return name
+
+
+def thumbnail_name(name, size):
+    base, extension = name.rsplit(".", 1)
+    return f"{base}_{size[0]}x{size[1]}.{extension}"
+
+
+def screenshot_urls(name):
+    """
+    URLs of a stored screenshot and of its SCREENSHOT_THUMBNAIL_SIZES thumbnails,
+    None unless `name` was returned by `store_screenshot()`. The thumbnails are
+    generated in the background, they can be missing right after the upload.
+    """
+    if not name or not name.startswith("screenshots/"):
+        return None
+    return {
+        "url": default_storage.url(name),
+        "thumbnails": {
+            f"{width}x{height}": default_storage.url(thumbnail_name(name, (width, height)))
+            for width, height in settings.SCREENSHOT_THUMBNAIL_SIZES
+        },
+    }
+
+
+def generate_thumbnails(name):
+    """Create the missing SCREENSHOT_THUMBNAIL_SIZES thumbnails of a stored screenshot."""
+    missing = [size for size in settings.SCREENSHOT_THUMBNAIL_SIZES if not default_storage.exists(thumbnail_name(name, size))]
+    if not missing:
+        return []
+    with default_storage.open(name) as source, Image.open(source) as image:
+        image.load()
+        created = []
+        for size in missing:
+            thumbnail = image.copy()
+            thumbnail.thumbnail(size)
+            content = io.BytesIO()
+            thumbnail.save(content, format=image.format)
+            created.append(default_storage.save(thumbnail_name(name, size), ContentFile(content.getvalue())))
+    return created
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.SCREENSHOT_THUMBNAIL_WORKERS, thread_name_prefix="thumbnails"
+            )
+        return _executor
+
+
+def schedule_thumbnails(name):
+    """Generate the thumbnails in the background pool, off the request path."""
+    return executor().submit(generate_thumbnails, name)
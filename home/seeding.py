@@ -0,0 +1,184 @@
+"""
+Users, apps, plans and subscriptions generated in bulk, shaped like production data.
+
+`seed()` writes the users in chunks, each chunk bulk creates its users and then
+their apps and subscriptions in one transaction. The chunks can run in a pool of
+processes. `manage.py seed_load_data` fills a database for load tests with it,
+and the endpoints benchmark seeds its throwaway database with it.
+"""
+import hashlib
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections, transaction
+from django.db.models import OuterRef, Subquery
+from faker import Faker
+
+from home.constants import APP_CHOICES_LIST, FRAMEWORK_CHOICES_LIST, PRICE_CHOICES_LIST
+from home.models import App, Plan, Subscription
+
+# Same catalog as home/fixtures/plan_data.yaml, generated tiers follow
+CATALOG_PLANS = [("Free", "$0"), ("Standard", "$10"), ("Pro", "$25")]
+# Most users have a few apps, some have hundreds (log-normal, capped)
+MAX_APPS_PER_USER = 1000
+APP_TYPE_WEIGHTS = [0.6, 0.4]
+# Web apps are mostly Django and mobile apps mostly React Native
+MATCHING_FRAMEWORK = 0.9
+# Share of apps with an active subscription, and chance of each extra plan change in their history
+ACTIVE_SHARE = 0.9
+PLAN_CHANGE = 0.3
+# Faker is slow per call, rows pick from pools of generated values instead
+POOL_SIZE = 500
+# SQLite caps a statement at 999 parameters
+LOOKUP_BATCH = 500
+
+
+def seed(users, apps_per_user=10, plans=len(CATALOG_PLANS), password="load-test", prefix="load", random_seed=0,
+         chunk_size=1000, batch_size=5000, workers=1, progress=None):
+    """
+    Create `users` users named `<prefix>_<name>_<number>` with their apps and
+    subscriptions, and the missing plans of a `plans` plans catalog. The same
+    `random_seed` generates the same data. `progress(done, chunks, totals)` is called
+    after each chunk, returns the (users, apps, subscriptions) totals.
+    """
+    plan_ids = seed_plans(plans)
+    # Hashed once, PBKDF2 takes tens of milliseconds per call
+    password = make_password(password)
+    options = {"apps_per_user": apps_per_user, "batch_size": batch_size, "prefix": prefix, "seed": random_seed}
+    chunks = [
+        (index, start, min(chunk_size, users - start), password, plan_ids, options)
+        for index, start in enumerate(range(0, users, chunk_size))
+    ]
+    # SQLite allows a single writer, processes would only wait on each other's locks
+    workers = 1 if connection.vendor == "sqlite" else max(1, workers)
+
+    totals = (0, 0, 0)
+    if workers == 1:
+        results = map(seed_chunk, chunks)
+    else:
+        # Children must open their own connections, not share the parent's socket
+        connections.close_all()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
+        results = executor.map(seed_chunk, chunks)
+    try:
+        for done, counts in enumerate(results, 1):
+            totals = tuple(total + count for total, count in zip(totals, counts))
+            if progress is not None:
+                progress(done, len(chunks), totals)
+    finally:
+        if workers > 1:
+            executor.shutdown()
+    return totals
+
+
+def seed_plans(count):
+    """Create the missing plans of a `count` plans catalog, returns their ids."""
+    existing = set(Plan.objects.filter(id__lte=count).values_list("id", flat=True))
+    plans = []
+    for id in range(1, count + 1):
+        if id in existing:
+            continue
+        if id <= len(CATALOG_PLANS):
+            name, price = CATALOG_PLANS[id - 1]
+        else:
+            name, price = f"Tier {id}", PRICE_CHOICES_LIST[id % len(PRICE_CHOICES_LIST)]
+        plans.append(Plan(id=id, name=name, description=f"This is {name} plan", price=price))
+    Plan.objects.bulk_create(plans)
+    return list(range(1, count + 1))
+
+
+def seed_chunk(chunk):
+    """Generate and write the users of one chunk with their apps and subscriptions, returns the row counts."""
+    index, start, count, password, plans, options = chunk
+    rng = random.Random(f"{options['seed']}:{index}")
+    fake = Faker()
+    fake.seed_instance(f"{options['seed']}:{index}")
+    pool = {
+        "user_names": [fake.user_name() for _ in range(POOL_SIZE)],
+        "names": [fake.name() for _ in range(POOL_SIZE)],
+        "app_names": [fake.word().capitalize() + " " + fake.word() for _ in range(POOL_SIZE)],
+        "descriptions": [fake.paragraph() for _ in range(POOL_SIZE)],
+        "domains": [fake.domain_name() for _ in range(POOL_SIZE)],
+    }
+    # Zipf-like plan popularity, most subscriptions are on the first plans
+    plan_weights = [1 / rank for rank in range(1, len(plans) + 1)]
+    mu = math.log(max(options["apps_per_user"], 0.1)) - 0.5
+
+    User = get_user_model()
+    # Django sizes SQLite batches to its parameter limit, an explicit size would go past it
+    batch_size = None if connection.vendor == "sqlite" else options["batch_size"]
+    with transaction.atomic():
+        users = []
+        for number in range(start, start + count):
+            user_name = rng.choice(pool["user_names"])
+            users.append(User(
+                username=f"{options['prefix']}_{user_name}_{number}",
+                email=f"{user_name}.{number}@{rng.choice(pool['domains'])}",
+                name=rng.choice(pool["names"]),
+                password=password,
+            ))
+        User.objects.bulk_create(users, batch_size=batch_size)
+        if users[0].pk is None:
+            # Only PostgreSQL returns the ids of bulk inserted rows
+            user_ids = [
+                id for usernames in batched([user.username for user in users])
+                for id in User.objects.filter(username__in=usernames).values_list("id", flat=True)
+            ]
+        else:
+            user_ids = [user.pk for user in users]
+
+        apps = []
+        for user_id in user_ids:
+            for _ in range(min(MAX_APPS_PER_USER, round(rng.lognormvariate(mu, 1)))):
+                type = rng.choices(APP_CHOICES_LIST, APP_TYPE_WEIGHTS)[0]
+                framework_index = APP_CHOICES_LIST.index(type)
+                if rng.random() > MATCHING_FRAMEWORK:
+                    framework_index = 1 - framework_index
+                name = rng.choice(pool["app_names"])
+                apps.append(App(
+                    name=name,
+                    description=rng.choice(pool["descriptions"]),
+                    type=type,
+                    framework=FRAMEWORK_CHOICES_LIST[framework_index],
+                    domain_name=rng.choice(pool["domains"]),
+                    # Content addressed like the uploads, apps of the same name share one
+                    screenshot=f"screenshots/{hashlib.sha256(name.encode()).hexdigest()}.png",
+                    user_id=user_id,
+                ))
+        App.objects.bulk_create(apps, batch_size=batch_size)
+        if apps and apps[0].pk is None:
+            app_rows = [
+                row for ids in batched(user_ids)
+                for row in App.objects.filter(user_id__in=ids).values_list("id", "user_id")
+            ]
+        else:
+            app_rows = [(app.pk, app.user_id) for app in apps]
+
+        subscriptions = []
+        for app_id, user_id in app_rows:
+            history = 1
+            while rng.random() < PLAN_CHANGE:
+                history += 1
+            active = rng.random() < ACTIVE_SHARE
+            for position in range(history):
+                subscriptions.append(Subscription(
+                    user_id=user_id,
+                    app_id=app_id,
+                    plan_id=rng.choices(plans, plan_weights)[0],
+                    active=active and position == history - 1,
+                ))
+        Subscription.objects.bulk_create(subscriptions, batch_size=batch_size)
+        for ids in batched(user_ids):
+            App.objects.filter(user_id__in=ids).update(subscription=Subquery(
+                Subscription.objects.filter(app=OuterRef("pk"), active=True).values("id")[:1]
+            ))
+    return len(users), len(apps), len(subscriptions)
+
+
+def batched(values):
+    for start in range(0, len(values), LOOKUP_BATCH):
+        yield values[start:start + LOOKUP_BATCH]
@@ -0,0 +1,27 @@
+from django.db import models, transaction
+from django.utils import timezone
+
+from home.models import App, Subscription
+
+
+def activate_subscription(subscription, *args, **kwargs):
+    """
+    Save `subscription` and make it the current subscription of its app.
+
+    Runs in one short transaction that locks only the app row, so concurrent
+    plan changes on the same app are serialized while other apps are not
+    blocked. Only the subscriptions that are still active are deactivated and
+    only `App.subscription_id` is written back. `updated_at` is bumped on every
+    touched row as `auto_now` would, it feeds the ETag/Last-Modified headers.
+    """
+    with transaction.atomic():
+        list(App.objects.select_for_update().filter(pk=subscription.app_id).values_list("pk", flat=True))
+        Subscription.objects.filter(app_id=subscription.app_id, active=True).exclude(
+            pk=subscription.pk
+        ).update(active=False, updated_at=timezone.now())
+        # Skip Subscription.save, which delegates back to this function
+        models.Model.save(subscription, *args, **kwargs)
+        App.objects.filter(pk=subscription.app_id).update(
+            subscription_id=subscription.pk, updated_at=timezone.now()
+        )
+    return subscription
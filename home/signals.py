@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from home.api.v1.authentication import evict_tokens
+from home.api.v1.caching import response_cache
+from home.catalog import plan_catalog
+from home.models import App, Plan, Subscription
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def evict_cached_token(sender, instance, created=False, **kwargs):
+    # A rotated token is a new row, the old key is evicted when it is deleted.
+    # Again on commit, a lookup can still read the row until then.
+    if created:
+        return
+    evict_tokens(instance.key)
+    transaction.on_commit(lambda: evict_tokens(instance.key))
+
+
+@receiver(post_save, sender=User)
+def evict_cached_user_tokens(sender, instance, created, **kwargs):
+    # Covers deactivation as well as any other change to the user row. Deleting
+    # the user deletes its tokens, which evicts them through the handler above.
+    if created:
+        return
+    keys = list(Token.objects.filter(user_id=instance.pk).values_list("key", flat=True))
+    evict_tokens(*keys)
+    transaction.on_commit(lambda: evict_tokens(*keys))
+    # Subscription responses can expand the user
+    response_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Plan)
+@receiver(post_delete, sender=Plan)
+def invalidate_plan_catalog(sender, **kwargs):
+    # Also fires for every row of `loaddata plan_data.yaml`. Invalidate again on
+    # commit so a reload done inside the transaction is not kept.
+    plan_catalog.invalidate()
+    transaction.on_commit(plan_catalog.invalidate)
+    response_cache.invalidate_plans()
+
+
+@receiver(post_save, sender=App)
+@receiver(post_delete, sender=App)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    # App responses embed the subscription id and subscription responses can
+    # expand the app, so one version covers all of a user's responses
+    if instance.user_id is not None:
+        response_cache.invalidate_user(instance.user_id)
@@ -0,0 +1,37 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from home import tiered_cache
+from home.api.v1.caching import response_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_process_caches():
+    # Test transactions are rolled back without firing the invalidation signals
+    cache.clear()
+    for tiered in tiered_cache.registry.values():
+        tiered.clear_local()
+        tiered.reset_stats()
+    response_cache.reset_stats()
+
+
+@pytest.fixture
+def token(user):
+    return Token.objects.create(user=user)
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def token_client(token):
+    # Authenticates through the Authorization header and the token cache, like the apps do
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
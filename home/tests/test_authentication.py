@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from home.api.v1.authentication import CachedTokenAuthentication, token_cache
+from home.models import App
+
+pytestmark = pytest.mark.django_db
+
+
+def test_cached_request_does_no_auth_queries(token_client, user):
+    App.objects.create(name="app", type="Web", framework="Django", user=user)
+    token_client.get("/api/v1/apps/")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = token_client.get("/api/v1/apps/")
+
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 1
+    assert not any("authtoken_token" in query["sql"] or "users_user" in query["sql"] for query in queries)
+
+
+def test_token_delete_evicts_cache(token_client, token):
+    assert token_client.get("/api/v1/apps/").status_code == 200
+
+    token.delete()
+
+    assert token_cache.get(token.key) is None
+    assert token_client.get("/api/v1/apps/").status_code == 401
+
+
+def test_user_deactivation_evicts_cache(token_client, user):
+    assert token_client.get("/api/v1/apps/").status_code == 200
+
+    user.is_active = False
+    user.save()
+
+    assert token_client.get("/api/v1/apps/").status_code == 401
+
+
+def test_token_deleted_during_fill_is_not_cached(token_client, token, monkeypatch):
+    load_credentials = CachedTokenAuthentication._load_credentials
+
+    def load_then_delete(self, key):
+        credentials = load_credentials(self, key)
+        token.delete()
+        return credentials
+
+    monkeypatch.setattr(CachedTokenAuthentication, "_load_credentials", load_then_delete)
+    # Authenticated with the rows it read, but must not cache them
+    assert token_client.get("/api/v1/apps/").status_code == 200
+    monkeypatch.undo()
+
+    assert token_cache.get(token.key) is None
+    assert token_client.get("/api/v1/apps/").status_code == 401
@@ -0,0 +1,32 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from home.benchmarks.endpoints import find_regressions, seed
+from home.models import App, Subscription
+
+pytestmark = pytest.mark.django_db
+
+
+def result(p95_ms, throughput_rps):
+    return {"transports": {"client": {"app_list": {"p95_ms": p95_ms, "throughput_rps": throughput_rps}}}}
+
+
+def test_seed_logs_in_as_the_user_with_the_most_apps():
+    user = seed(150)
+
+    assert get_user_model().objects.count() == 15
+    most_apps = max(App.objects.filter(user_id=user_id).count() for user_id in App.objects.values_list("user", flat=True))
+    assert App.objects.filter(user=user).count() == most_apps > 0
+    assert Subscription.objects.filter(user=user).exists()
+    assert user.username.startswith("bench_")
+    assert user.check_password("benchmark-password")
+
+
+def test_regressions_past_the_threshold_are_reported():
+    assert find_regressions(result(10, 100), result(11.9, 81), 0.2) == []
+    assert find_regressions(result(10, 100), result(12.5, 70), 0.2) == [
+        "client app_list: p95 10.00ms -> 12.50ms",
+        "client app_list: throughput 100.0/s -> 70.0/s",
+    ]
+    # Scenarios missing from the baseline are new, not regressions
+    assert find_regressions({"transports": {}}, result(12.5, 70), 0.2) == []
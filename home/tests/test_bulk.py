@@ -0,0 +1,118 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from home.models import App
+from users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def make_apps(user, count):
+    return App.objects.bulk_create(
+        [App(name=f"app {i}", type="Web", framework="Django", user=user) for i in range(count)]
+    )
+
+
+def test_bulk_create(api_client, user):
+    items = [{"name": f"app {i}", "type": "Web", "framework": "Django"} for i in range(1000)]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post("/api/v1/apps/bulk/", items, format="json")
+
+    assert response.status_code == 201
+    assert App.objects.filter(user=user).count() == 1000
+    assert len(queries) < 20
+
+
+def test_bulk_create_reports_invalid_items(api_client, user):
+    items = [
+        {"name": "ok", "type": "Web", "framework": "Django"},
+        {"name": "bad", "type": "Desktop", "framework": "Django"},
+    ]
+
+    response = api_client.post("/api/v1/apps/bulk/", items, format="json")
+
+    assert response.status_code == 400
+    assert response.json()[0] == {}
+    assert "type" in response.json()[1]
+    assert not App.objects.exists()
+
+
+def test_bulk_update(api_client, user):
+    make_apps(user, 3)
+    apps = list(App.objects.filter(user=user))
+    items = [{"id": app.id, "name": f"renamed {app.id}", "type": "Mobile", "framework": "React Native"} for app in apps]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.put("/api/v1/apps/bulk/", items, format="json")
+
+    assert response.status_code == 200
+    assert set(App.objects.values_list("type", flat=True)) == {"Mobile"}
+    assert len(queries) <= 4
+
+
+def test_bulk_update_rejects_foreign_apps(api_client, user):
+    make_apps(user, 1)
+    make_apps(UserFactory(), 1)
+    own_id, other_id = App.objects.order_by("id").values_list("id", flat=True)
+    items = [
+        {"id": own_id, "name": "mine", "type": "Web", "framework": "Django"},
+        {"id": other_id, "name": "theirs", "type": "Web", "framework": "Django"},
+    ]
+
+    response = api_client.put("/api/v1/apps/bulk/", items, format="json")
+
+    assert response.status_code == 400
+    assert response.json()[0] == {}
+    assert "id" in response.json()[1]
+    assert not App.objects.filter(name__in=["mine", "theirs"]).exists()
+
+
+def test_bulk_delete(api_client, user):
+    make_apps(user, 3)
+    ids = list(App.objects.values_list("id", flat=True))
+
+    response = api_client.delete("/api/v1/apps/bulk/", ids[:2], format="json")
+
+    assert response.status_code == 200
+    assert list(App.objects.values_list("id", flat=True)) == ids[2:]
+
+
+def test_bulk_delete_is_scoped_to_owner(api_client, user):
+    make_apps(UserFactory(), 1)
+    other_id = App.objects.get().id
+
+    response = api_client.delete("/api/v1/apps/bulk/", [other_id], format="json")
+
+    assert response.status_code == 400
+    assert App.objects.filter(id=other_id).exists()
+
+
+@pytest.mark.parametrize("bad_id", [{"id": 1}, [1], "1", True])
+def test_bulk_update_rejects_invalid_ids(api_client, user, bad_id):
+    make_apps(user, 1)
+    own_id = App.objects.get().id
+    items = [
+        {"id": own_id, "name": "mine", "type": "Web", "framework": "Django"},
+        {"id": bad_id, "name": "bad", "type": "Web", "framework": "Django"},
+    ]
+
+    response = api_client.put("/api/v1/apps/bulk/", items, format="json")
+
+    assert response.status_code == 400
+    assert response.json()[0] == {}
+    assert response.json()[1] == {"id": ["A valid integer is required."]}
+    assert not App.objects.filter(name__in=["mine", "bad"]).exists()
+
+
+@pytest.mark.parametrize("bad_id", [{"id": 1}, [1], "1", True])
+def test_bulk_delete_rejects_invalid_ids(api_client, user, bad_id):
+    make_apps(user, 1)
+    own_id = App.objects.get().id
+
+    response = api_client.delete("/api/v1/apps/bulk/", [own_id, bad_id], format="json")
+
+    assert response.status_code == 400
+    assert response.json() == [{}, {"id": ["A valid integer is required."]}]
+    assert App.objects.filter(id=own_id).exists()
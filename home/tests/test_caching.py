@@ -0,0 +1,121 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from home.api.v1.caching import response_cache
+from home.models import App, Plan, Subscription
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def app(user):
+    return App.objects.create(name="app", type="Web", framework="Django", user=user)
+
+
+@pytest.fixture
+def subscription(user, app):
+    plan = Plan.objects.create(id=1, name="Free", description="Free plan", price="$0")
+    return Subscription.objects.create(user=user, plan=plan, app=app, active=True)
+
+
+def test_repeated_list_is_served_from_cache(api_client, app):
+    first = api_client.get("/api/v1/apps/")
+
+    with CaptureQueriesContext(connection) as queries:
+        second = api_client.get("/api/v1/apps/")
+
+    assert second.status_code == 200
+    assert second.data == first.data
+    assert second["ETag"] == first["ETag"]
+    assert "Last-Modified" not in second
+    assert len(queries) == 0
+    assert response_cache.stats()["hits"] == 1
+    assert response_cache.stats()["misses"] == 1
+
+
+def test_cached_response_answers_conditional_requests(api_client, app):
+    etag = api_client.get(f"/api/v1/apps/{app.id}/")["ETag"]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(f"/api/v1/apps/{app.id}/", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert len(queries) == 0
+
+
+def test_each_url_has_its_own_entry(api_client, app):
+    api_client.get("/api/v1/apps/")
+    response = api_client.get("/api/v1/apps/", {"fields": "name"})
+
+    assert response.data["results"] == [{"name": "app"}]
+    assert response_cache.stats()["hits"] == 0
+
+
+def test_save_invalidates_the_users_responses(api_client, app, subscription):
+    api_client.get("/api/v1/apps/")
+    api_client.get(f"/api/v1/subscriptions/{subscription.id}/", {"expand": "app"})
+
+    app.name = "renamed"
+    app.save()
+
+    assert api_client.get("/api/v1/apps/").data["results"][0]["name"] == "renamed"
+    assert api_client.get(f"/api/v1/subscriptions/{subscription.id}/", {"expand": "app"}).data["app"]["name"] == "renamed"
+
+
+def test_delete_invalidates_the_users_responses(api_client, app):
+    api_client.get("/api/v1/apps/")
+
+    app.delete()
+
+    assert api_client.get("/api/v1/apps/").data["results"] == []
+
+
+def test_plan_change_invalidates_expanded_subscriptions(api_client, subscription):
+    api_client.get("/api/v1/subscriptions/", {"expand": "plan"})
+
+    Plan.objects.filter(id=subscription.plan_id).update(name="Starter")
+    Plan.objects.get(id=subscription.plan_id).save()
+
+    response = api_client.get("/api/v1/subscriptions/", {"expand": "plan"})
+    assert response.data["results"][0]["plan"]["name"] == "Starter"
+
+
+def test_bulk_create_invalidates(api_client, app):
+    api_client.get("/api/v1/apps/")
+
+    api_client.post("/api/v1/apps/bulk/", [{"name": "other", "type": "Web", "framework": "Django"}], format="json")
+
+    assert len(api_client.get("/api/v1/apps/").data["results"]) == 2
+
+
+def test_other_users_are_not_invalidated(api_client, app):
+    other = User.objects.create(username="other", email="other@example.com")
+    api_client.get("/api/v1/apps/")
+
+    App.objects.create(name="theirs", type="Web", framework="Django", user=other)
+    api_client.get("/api/v1/apps/")
+
+    assert response_cache.stats()["hits"] == 1
+
+
+def test_errors_are_not_cached(api_client, user):
+    other = User.objects.create(username="other", email="other@example.com")
+    app = App.objects.create(name="theirs", type="Web", framework="Django", user=other)
+
+    assert api_client.get(f"/api/v1/apps/{app.id}/").status_code == 403
+    App.objects.filter(id=app.id).update(user=user)
+    assert api_client.get(f"/api/v1/apps/{app.id}/").status_code == 200
+
+
+def test_stats_endpoint_is_staff_only(api_client, user):
+    assert api_client.get("/api/v1/cache-stats/").status_code == 403
+
+    user.is_staff = True
+    user.save()
+    response = api_client.get("/api/v1/cache-stats/")
+
+    assert response.status_code == 200
+    assert set(response.data["responses"]) == {"hits", "misses", "hit_ratio", "backend"}
+    assert set(response.data["tiered"]["tokens"]) == {"local", "shared"}
@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from home.api.v1.serializers import SubscriptionSerializer
+from home.catalog import plan_catalog
+from home.models import App, Plan
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def plans():
+    return [
+        Plan.objects.create(id=1, name="Free", description="Free plan", price="$0"),
+        Plan.objects.create(id=2, name="Pro", description="Pro plan", price="$25"),
+    ]
+
+
+def test_plan_endpoints_skip_the_database(api_client, plans):
+    api_client.get("/api/v1/plans/")
+
+    with CaptureQueriesContext(connection) as queries:
+        listed = api_client.get("/api/v1/plans/")
+        detail = api_client.get("/api/v1/plans/2/")
+
+    assert len(queries) == 0
+    assert [plan["name"] for plan in listed.json()] == ["Free", "Pro"]
+    assert detail.json()["price"] == "$25"
+    assert api_client.get("/api/v1/plans/3/").status_code == 404
+
+
+def test_plan_changes_invalidate_the_catalog(plans):
+    assert plan_catalog.payload(1)["name"] == "Free"
+
+    Plan.objects.filter(id=1).get().delete()
+
+    assert plan_catalog.payload(1) is None
+
+
+def test_subscription_serializer_resolves_plan_from_catalog(user, plans):
+    app = App.objects.create(name="app", type="Web", framework="Django", user=user)
+    plan_catalog.list()
+    serializer = SubscriptionSerializer(data={"user": user.id, "plan": 2, "app": app.id, "active": True})
+
+    with CaptureQueriesContext(connection) as queries:
+        assert serializer.is_valid(), serializer.errors
+
+    assert serializer.validated_data["plan"].name == "Pro"
+    assert not any("home_plan" in query["sql"] for query in queries)
+
+
+def test_subscription_serializer_rejects_unknown_plan(user, plans):
+    serializer = SubscriptionSerializer(data={"user": user.id, "plan": 9, "app": 1, "active": True})
+
+    assert not serializer.is_valid()
+    assert "plan" in serializer.errors
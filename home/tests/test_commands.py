@@ -0,0 +1,76 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+
+from home.models import App, Plan, Subscription
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+def test_explain_queries_uses_indexes():
+    out = StringIO()
+
+    call_command("explain_queries", stdout=out)
+
+    assert "home_app_user_created_id_idx" in out.getvalue()
+    assert "home_sub_user_created_id_idx" in out.getvalue()
+    assert "home_sub_one_active_per_app" in out.getvalue()
+
+
+def test_explain_queries_uses_a_seeded_subscription(user):
+    app = App.objects.create(name="app", type="Web", framework="Django", user=user)
+    plan = Plan.objects.create(id=1, name="Free", description="Free plan", price="$0")
+    subscription = Subscription.objects.create(user=user, plan=plan, app=app, active=True)
+    out = StringIO()
+
+    call_command("explain_queries", stdout=out)
+
+    assert f"app id: {app.id}, subscription id: {subscription.id}" in out.getvalue()
+
+
+def test_project_report_lists_models_and_urls():
+    out = StringIO()
+
+    call_command("generate_project_report", stdout=out)
+
+    report = json.loads(out.getvalue())
+    assert "App" in report["models"]
+    assert {"url": "/api/v1/apps/", "module": "home.api.v1.viewsets.AppViewSet", "name": "apps-list", "decorators": ""} in report["urls"]
+
+
+def test_project_report_profile(user):
+    App.objects.create(name="app", type="Web", framework="Django", user=user)
+    out = StringIO()
+
+    call_command("generate_project_report", "--profile", stdout=out)
+
+    report = json.loads(out.getvalue())
+    urls = {url["url"]: url for url in report["urls"]}
+    assert urls["/api/v1/apps/<pk>/"]["resolve_seconds"] > 0
+    assert report["model_rows"]["home.App"] == {"rows": 1, "estimated": False}
+    assert report["model_rows"]["authtoken.TokenProxy"] is None
+
+
+def test_seed_load_data():
+    out = StringIO()
+
+    call_command("seed_load_data", users=30, apps_per_user=3, chunk_size=20, stdout=out)
+
+    assert "2/2 chunks: 30 users" in out.getvalue()
+    assert User.objects.filter(username__startswith="load_").count() == 30
+    assert Plan.objects.count() == 3
+    assert App.objects.filter(user__username__startswith="load_").exists()
+    # Every app points at its active subscription, if it has one
+    assert not App.objects.exclude(subscription=None).exclude(subscription__active=True).exists()
+    assert App.objects.filter(subscription=None).count() == App.objects.exclude(
+        id__in=Subscription.objects.filter(active=True).values("app_id")
+    ).count()
+    assert User.objects.filter(username__startswith="load_").first().check_password("load-test")
+
+    with pytest.raises(CommandError):
+        call_command("seed_load_data", users=1, stdout=out)
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from home.models import App
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def app(user):
+    return App.objects.create(name="app", type="Web", framework="Django", user=user)
+
+
+def test_list_not_modified(api_client, app):
+    response = api_client.get("/api/v1/apps/")
+    etag = response["ETag"]
+    # Only the validators aggregate runs when the response isn't cached
+    cache.clear()
+
+    with CaptureQueriesContext(connection) as queries:
+        cached = api_client.get("/api/v1/apps/", HTTP_IF_NONE_MATCH=etag)
+
+    assert cached.status_code == 304
+    assert cached["ETag"] == etag
+    assert len(queries) == 1
+
+
+def test_list_etag_changes_with_data(api_client, app):
+    etag = api_client.get("/api/v1/apps/")["ETag"]
+
+    app.name = "renamed"
+    app.save()
+
+    response = api_client.get("/api/v1/apps/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_list_delete_is_not_hidden_by_if_modified_since(api_client, app, user):
+    older = App.objects.create(name="older", type="Web", framework="Django", user=user)
+    App.objects.filter(id=older.id).update(updated_at=app.updated_at - timedelta(days=1))
+    response = api_client.get("/api/v1/apps/")
+    assert "Last-Modified" not in response
+
+    older.delete()
+
+    response = api_client.get("/api/v1/apps/", HTTP_IF_MODIFIED_SINCE=http_date(app.updated_at.timestamp() + 60))
+    assert response.status_code == 200
+    assert [item["name"] for item in response.data["results"]] == ["app"]
+
+
+def test_list_etag_depends_on_page(api_client, app):
+    assert api_client.get("/api/v1/apps/")["ETag"] != api_client.get("/api/v1/apps/", {"page_size": 1})["ETag"]
+
+
+def test_detail_if_modified_since(api_client, app):
+    response = api_client.get(f"/api/v1/apps/{app.id}/")
+
+    cached = api_client.get(f"/api/v1/apps/{app.id}/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+
+    assert cached.status_code == 304
+    assert cached["Last-Modified"] == response["Last-Modified"]
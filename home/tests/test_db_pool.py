@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+
+import pytest
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from rest_framework.test import APIClient
+
+from backend_app_32996.db import pool as db_pool
+from backend_app_32996.db.pool import ConnectionPool, PooledDatabaseWrapperMixin, PoolTimeout
+
+
+def make_pool(**kwargs):
+    kwargs = dict({"max_size": 2, "idle_timeout": 60, "checkout_timeout": 0.1}, **kwargs)
+    return ConnectionPool(
+        is_healthy=PooledDatabaseWrapperMixin.pool_is_healthy, reset=PooledDatabaseWrapperMixin.pool_reset, **kwargs
+    )
+
+
+def connect():
+    return sqlite3.connect(":memory:", check_same_thread=False)
+
+
+@pytest.fixture
+def wrapper(tmp_path):
+    settings_dict = {
+        "ENGINE": "django.db.backends.sqlite3", "NAME": str(tmp_path / "pool.sqlite3"), "OPTIONS": {},
+        "TIME_ZONE": None, "AUTOCOMMIT": True, "ATOMIC_REQUESTS": False, "CONN_MAX_AGE": 0,
+        "USER": "", "PASSWORD": "", "HOST": "", "PORT": "", "TEST": {}, "POOL": {"MAX_SIZE": 1},
+    }
+    wrapper = db_pool.pooled(DatabaseWrapper)(settings_dict, alias="pool-test")
+    yield wrapper
+    wrapper.close()
+    db_pool.close_pools("pool-test")
+
+
+def test_connections_are_reused():
+    pool = make_pool()
+    first = pool.checkout(connect)
+    pool.checkin(first)
+
+    assert pool.checkout(connect) is first
+    assert (pool.stats()["created"], pool.stats()["reused"]) == (1, 1)
+
+
+def test_checkout_waits_for_a_connection_then_times_out():
+    pool = make_pool(max_size=1)
+    raw = pool.checkout(connect)
+    threading.Timer(0.02, pool.checkin, [raw]).start()
+
+    assert pool.checkout(connect) is raw
+    with pytest.raises(PoolTimeout):
+        pool.checkout(connect)
+    assert (pool.stats()["waits"], pool.stats()["timeouts"]) == (2, 1)
+
+
+def test_idle_connections_expire():
+    pool = make_pool(idle_timeout=0)
+    first = pool.checkout(connect)
+    pool.checkin(first)
+
+    assert pool.checkout(connect) is not first
+    assert pool.stats()["expired"] == 1
+
+
+def test_unhealthy_connections_are_replaced():
+    pool = make_pool()
+    first = pool.checkout(connect)
+    pool.checkin(first)
+    first.close()
+
+    assert pool.checkout(connect) is not first
+    assert pool.stats()["unhealthy"] == 1
+
+
+def test_open_transactions_are_rolled_back_on_checkin():
+    pool = make_pool()
+    raw = pool.checkout(connect)
+    raw.execute("CREATE TABLE t (id integer)")
+    raw.commit()
+    raw.execute("INSERT INTO t VALUES (1)")
+    pool.checkin(raw)
+
+    assert pool.checkout(connect).execute("SELECT count(*) FROM t").fetchone() == (0,)
+
+
+@pytest.mark.django_db
+def test_wrapper_gives_its_connection_back_on_close(wrapper):
+    for _ in range(3):
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        wrapper.close()
+
+    stats = [stats for stats in db_pool.stats() if stats["alias"] == "pool-test"][0]
+    assert (stats["created"], stats["reused"], stats["idle"], stats["in_use"]) == (1, 2, 1, 0)
+
+
+@pytest.mark.django_db
+def test_stats_endpoint_is_staff_only(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    assert client.get("/api/v1/db-stats/").status_code == 403
+
+    user.is_staff = True
+    client.force_authenticate(user)
+
+    assert client.get("/api/v1/db-stats/").status_code == 200
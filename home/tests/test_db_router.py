@@ -0,0 +1,127 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends import locmem
+from django.core.management import call_command
+from django.db import connections
+
+from backend_app_32996.db import router
+from home.api.v1.caching import response_cache
+from home.catalog import plan_catalog
+from home.models import App, Plan
+
+
+@pytest.fixture
+def replica(transactional_db, settings, tmp_path):
+    # A second SQLite database standing in for a replica that is never caught up
+    connections.databases["replica"] = dict(
+        connections["default"].settings_dict, NAME=str(tmp_path / "replica.sqlite3"), TEST={}
+    )
+    call_command("migrate", database="replica", verbosity=0)
+    settings.DATABASE_REPLICAS = ["replica"]
+    state = router._state.set(None)
+    router.reset_stats()
+    yield "replica"
+    router._state.reset(state)
+    connections["replica"].close()
+    del connections.databases["replica"]
+    delattr(connections._connections, "replica")
+
+
+def create_app(user, name="app"):
+    return App.objects.create(name=name, type="Web", framework="Django", user=user)
+
+
+def exported_apps(client):
+    # Not cached, so read from a replica
+    response = client.get("/api/v1/export/", {"output": "json"})
+    return [app["name"] for app in json.loads(b"".join(response.streaming_content))["apps"]]
+
+
+def test_get_requests_read_from_the_replica(replica, token_client, user):
+    create_app(user)
+
+    assert exported_apps(token_client) == []
+    assert router.stats()["aliases"]["replica"]["reads"] > 0
+
+
+def test_clients_read_their_writes(replica, token_client, user):
+    response = token_client.post("/api/v1/apps/", {"name": "app", "type": "Web", "framework": "Django"}, format="json")
+    assert response.status_code == 201
+
+    assert exported_apps(token_client) == ["app"]
+    assert router.stats()["primary_fallbacks"]["pinned"] > 0
+
+    # Pin expired
+    cache.clear()
+    assert exported_apps(token_client) == []
+
+
+def test_pin_outlasts_the_replica_lag(replica, token_client, user, settings, monkeypatch):
+    settings.DATABASE_REPLICA_PIN_SECONDS = 5
+    settings.DATABASE_REPLICA_MAX_LAG = 10
+    monkeypatch.setattr(router, "replication_lag", lambda alias: 8.0)
+    token_client.post("/api/v1/apps/", {"name": "app", "type": "Web", "framework": "Django"}, format="json")
+
+    # 6 seconds later, the replica is 8 seconds behind and still fresh enough
+    later = time.time() + 6
+    monkeypatch.setattr(locmem, "time", SimpleNamespace(time=lambda: later))
+
+    assert exported_apps(token_client) == ["app"]
+    assert router.stats()["primary_fallbacks"]["lagging"] == 0
+
+
+def test_cache_misses_read_from_the_replica(replica, token_client, user):
+    create_app(user)
+
+    # Not pinned, the replica doesn't have the app yet
+    assert token_client.get("/api/v1/apps/").data["results"] == []
+    assert router.stats()["aliases"]["replica"]["reads"] > 0
+
+
+def test_recent_changes_are_not_cached_from_the_replica(replica, token_client, user, settings, monkeypatch):
+    settings.DATABASE_REPLICA_MAX_LAG = 10
+    create_app(user)
+    Plan.objects.create(id=1, name="Free", description="Free plan", price="$0")
+
+    token_client.get("/api/v1/apps/")
+    token_client.get("/api/v1/plans/")
+    token_client.get("/api/v1/apps/")
+    assert response_cache.stats()["hits"] == 0
+    assert plan_catalog._cache.shared.get(plan_catalog._cache._shared_key(plan_catalog.key)) is None
+
+    # The replica has had time to catch up
+    later = time.time() + 11
+    monkeypatch.setattr(router, "time", SimpleNamespace(time=lambda: later, monotonic=time.monotonic))
+    token_client.get("/api/v1/apps/")
+    token_client.get("/api/v1/plans/")
+    token_client.get("/api/v1/apps/")
+    assert response_cache.stats()["hits"] == 1
+    assert plan_catalog._cache.shared.get(plan_catalog._cache._shared_key(plan_catalog.key)) is not None
+
+
+def test_lagging_replicas_are_skipped(replica, token_client, user, monkeypatch):
+    monkeypatch.setattr(router, "replication_lag", lambda alias: 60.0)
+    create_app(user)
+
+    assert exported_apps(token_client) == ["app"]
+    stats = router.stats()
+    assert stats["primary_fallbacks"]["lagging"] > 0
+    assert stats["replicas"]["replica"]["lag_seconds"] == 60.0
+
+
+def test_reads_stay_on_the_primary_after_a_write_outside_requests(transactional_db, user, replica):
+    assert router.ReplicaRouter().db_for_read(App) == "replica"
+
+    create_app(user)
+
+    assert router.ReplicaRouter().db_for_read(App) == "default"
+    assert App.objects.count() == 1
+
+
+def test_replicas_are_not_migrated(replica):
+    assert router.ReplicaRouter().allow_migrate("replica", "home") is False
+    assert router.ReplicaRouter().allow_migrate("default", "home") is None
@@ -0,0 +1,146 @@
+import smtplib
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection as db_connection, transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from home.email_queue import EmailQueueWorker
+from home.models import QueuedEmail
+
+pytestmark = pytest.mark.django_db
+
+
+class CountingBackend(locmem.EmailBackend):
+    # Opens like the SMTP backend: once, until closed
+    opened = 0
+
+    def open(self):
+        if getattr(self, "connection", None) is None:
+            self.connection = True
+            CountingBackend.opened += 1
+
+    def close(self):
+        self.connection = None
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+
+@pytest.fixture(autouse=True)
+def queued(settings):
+    settings.EMAIL_BACKEND = "home.email_queue.QueuedEmailBackend"
+    settings.EMAIL_DELIVERY_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+
+def test_password_reset_mail_is_queued_then_sent(user):
+    response = APIClient().post("/api/v1/password/reset/", {"email": user.email}, format="json")
+
+    assert response.status_code == 201
+    assert mail.outbox == []
+    assert QueuedEmail.objects.get().recipients == user.email
+
+    out = StringIO()
+    call_command("send_queued_email", "--once", stdout=out)
+
+    assert out.getvalue() == "1 sent, 0 to retry, 0 failed\n"
+    assert [message.to for message in mail.outbox] == [[user.email]]
+    assert QueuedEmail.objects.get().status == QueuedEmail.SENT
+
+
+def test_mail_of_rolled_back_transactions_is_not_queued():
+    with transaction.atomic():
+        mail.send_mail("Subject", "Body", "from@example.com", ["to@example.com"])
+        transaction.set_rollback(True)
+
+    assert not QueuedEmail.objects.exists()
+
+
+def test_failed_signup_queues_nothing(monkeypatch):
+    def setup_user_email(request, user, addresses):
+        mail.send_mail("Confirm", "Body", "from@example.com", [user.email])
+        raise RuntimeError("Email setup failed")
+
+    monkeypatch.setattr("home.api.v1.serializers.setup_user_email", setup_user_email)
+
+    with pytest.raises(RuntimeError):
+        APIClient().post("/api/v1/signup//", {"name": "Jane", "email": "jane@example.com", "password": "s3cret-pass"}, format="json")
+
+    assert not QueuedEmail.objects.exists()
+    assert not get_user_model().objects.filter(email="jane@example.com").exists()
+
+
+def test_batches_share_one_connection():
+    CountingBackend.opened = 0
+    for i in range(5):
+        mail.send_mail(f"Subject {i}", "Body", "from@example.com", ["to@example.com"])
+
+    totals = EmailQueueWorker(batch_size=2, backend="home.tests.test_email_queue.CountingBackend").drain()
+
+    assert totals == {"sent": 5, "retried": 0, "failed": 0}
+    assert [message.subject for message in mail.outbox] == [f"Subject {i}" for i in range(5)]
+    assert CountingBackend.opened == 1
+
+
+class CrashingBackend(locmem.EmailBackend):
+    # Records whether a transaction was open while sending, the worker dies on the second message
+    in_transaction = []
+
+    def send_messages(self, email_messages):
+        CrashingBackend.in_transaction.append(db_connection.in_atomic_block)
+        if len(CrashingBackend.in_transaction) == 2:
+            raise SystemExit()
+        return super().send_messages(email_messages)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sent_messages_are_kept_when_the_worker_dies_mid_batch():
+    CrashingBackend.in_transaction = []
+    for i in range(3):
+        mail.send_mail(f"Subject {i}", "Body", "from@example.com", ["to@example.com"])
+    worker = EmailQueueWorker(claim_timeout=60, backend="home.tests.test_email_queue.CrashingBackend")
+
+    with pytest.raises(SystemExit):
+        worker.drain()
+
+    assert CrashingBackend.in_transaction == [False, False]
+    assert [message.subject for message in mail.outbox] == ["Subject 0"]
+    first, second, third = QueuedEmail.objects.order_by("id")
+    assert first.status == QueuedEmail.SENT
+    # Claimed by the dead worker, sent by the next one once the claim expires
+    assert second.status == third.status == QueuedEmail.PENDING
+    assert second.next_attempt_at > timezone.now() + timedelta(seconds=50)
+    assert worker.drain() == {"sent": 0, "retried": 0, "failed": 0}
+
+    QueuedEmail.objects.update(next_attempt_at=timezone.now())
+
+    assert EmailQueueWorker(backend="django.core.mail.backends.locmem.EmailBackend").drain() == {
+        "sent": 2, "retried": 0, "failed": 0
+    }
+    assert [message.subject for message in mail.outbox] == ["Subject 0", "Subject 1", "Subject 2"]
+
+
+def test_failures_are_retried_with_backoff_then_given_up():
+    mail.send_mail("Subject", "Body", "from@example.com", ["to@example.com"])
+    worker = EmailQueueWorker(max_attempts=2, backoff=60, backend="home.tests.test_email_queue.FailingBackend")
+
+    assert worker.drain() == {"sent": 0, "retried": 1, "failed": 0}
+    email = QueuedEmail.objects.get()
+    assert email.next_attempt_at > timezone.now() + timedelta(seconds=50)
+    assert email.last_error == "SMTPServerDisconnected: Connection unexpectedly closed"
+    # Not due yet
+    assert worker.drain() == {"sent": 0, "retried": 0, "failed": 0}
+
+    QueuedEmail.objects.update(next_attempt_at=timezone.now())
+
+    assert worker.drain() == {"sent": 0, "retried": 0, "failed": 1}
+    assert QueuedEmail.objects.get().status == QueuedEmail.FAILED
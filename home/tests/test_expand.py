@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from home.catalog import plan_catalog
+from home.models import App, Plan, Subscription
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def subscriptions(user):
+    plans = [Plan.objects.create(id=i, name=f"plan {i}", description="plan", price="$0") for i in range(1, 4)]
+    App.objects.bulk_create(
+        [App(name=f"app {i}", type="Web", framework="Django", user=user) for i in range(50)]
+    )
+    apps = list(App.objects.filter(user=user))
+    return Subscription.objects.bulk_create([
+        Subscription(user=user, plan=plans[i % 3], app=apps[i % 50], active=False) for i in range(500)
+    ])
+
+
+@pytest.mark.parametrize("expand", ["", "plan", "app", "plan,app", "plan,app,user"])
+def test_expanded_list_is_one_query(api_client, subscriptions, expand):
+    plan_catalog.list()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/v1/subscriptions/", {"page_size": 500, "expand": expand})
+
+    results = response.json()["results"]
+    assert len(results) == 500
+    # One aggregate for the ETag, one for the page
+    assert len(queries) == 2
+    if "plan" in expand:
+        assert results[0]["plan"]["name"].startswith("plan")
+    if "app" in expand:
+        assert results[0]["app"]["name"].startswith("app")
+
+
+def test_expanded_detail(api_client, user, subscriptions):
+    subscription = Subscription.objects.filter(user=user).first()
+
+    response = api_client.get(f"/api/v1/subscriptions/{subscription.id}/", {"expand": "app"})
+
+    assert response.json()["app"]["id"] == subscription.app_id
+    assert isinstance(response.json()["plan"], int)
+
+
+def test_unknown_expand(api_client, subscriptions):
+    response = api_client.get("/api/v1/subscriptions/", {"expand": "owner"})
+
+    assert response.status_code == 400
+    assert "expand" in response.json()
+
+
+@pytest.mark.parametrize("expand", ["app", "plan"])
+def test_list_etag_changes_with_expanded_relations(api_client, user, subscriptions, expand):
+    etag = api_client.get("/api/v1/subscriptions/", {"expand": expand})["ETag"]
+
+    related = App.objects.filter(user=user).last() if expand == "app" else Plan.objects.get(id=1)
+    related.name = "renamed"
+    related.save()
+
+    response = api_client.get("/api/v1/subscriptions/", {"expand": expand}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_detail_etag_changes_with_expanded_app(api_client, user, subscriptions):
+    subscription = Subscription.objects.filter(user=user).first()
+    url = f"/api/v1/subscriptions/{subscription.id}/"
+    response = api_client.get(url, {"expand": "app"})
+    assert "Last-Modified" not in response
+
+    app = App.objects.get(id=subscription.app_id)
+    app.name = "renamed"
+    app.save()
+
+    response = api_client.get(url, {"expand": "app"}, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 200
+    assert response.json()["app"]["name"] == "renamed"
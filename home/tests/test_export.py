@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from home.models import App, Plan, Subscription
+from users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def data(user, settings):
+    settings.EXPORT_CHUNK_SIZE = 2
+    plan = Plan.objects.create(id=1, name="Free", description="Free plan", price="$0")
+    apps = [App.objects.create(name=f"app {i}", type="Web", framework="Django", user=user) for i in range(5)]
+    Subscription.objects.create(user=user, plan=plan, app=apps[0], active=True)
+    App.objects.create(name="other", type="Web", framework="Django", user=UserFactory())
+    return apps
+
+
+def test_ndjson_export(api_client, data):
+    response = api_client.get("/api/v1/export/")
+
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+    assert [line["type"] for line in lines] == ["app"] * 5 + ["subscription"]
+    assert [line["data"]["id"] for line in lines[:5]] == [app.id for app in data]
+
+
+def test_json_export(api_client, data):
+    response = api_client.get("/api/v1/export/", {"output": "json"})
+
+    document = json.loads(b"".join(response.streaming_content))
+    assert len(document["apps"]) == 5
+    assert len(document["subscriptions"]) == 1
+
+
+def test_json_export_without_rows(api_client):
+    response = api_client.get("/api/v1/export/", {"output": "json"})
+
+    assert json.loads(b"".join(response.streaming_content)) == {"apps": [], "subscriptions": []}
+
+
+def test_unknown_output(api_client):
+    assert api_client.get("/api/v1/export/", {"output": "csv"}).status_code == 400
@@ -0,0 +1,37 @@
+import pytest
+
+from home.api.v1.fast_serializers import AppValuesSerializer, PlanValuesSerializer, SubscriptionValuesSerializer
+from home.api.v1.serializers import AppSerializer, PlanSerializer, SubscriptionSerializer
+from home.models import App, Plan, Subscription
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def subscription(user):
+    plan = Plan.objects.create(id=1, name="Free", description="Free plan", price="$0")
+    App.objects.create(name="bare", type="Mobile", framework="React Native")
+    app = App.objects.create(
+        name="app", type="Web", framework="Django", description="about", domain_name="app.test", user=user
+    )
+    return Subscription.objects.create(user=user, plan=plan, app=app, active=True)
+
+
+@pytest.mark.parametrize("serializer_class, values_serializer_class", [
+    (AppSerializer, AppValuesSerializer),
+    (PlanSerializer, PlanValuesSerializer),
+    (SubscriptionSerializer, SubscriptionValuesSerializer),
+])
+def test_same_output_as_model_serializer(subscription, serializer_class, values_serializer_class):
+    queryset = serializer_class.Meta.model.objects.order_by("id")
+    values_serializer = values_serializer_class()
+
+    assert values_serializer.to_representation(values_serializer.values(queryset)) == serializer_class(queryset, many=True).data
+
+
+def test_selected_fields(subscription):
+    serializer = AppValuesSerializer(["name", "created_at"])
+
+    data = serializer.to_representation(serializer.values(App.objects.order_by("id")))
+
+    assert data == AppSerializer(App.objects.order_by("id"), many=True, fields=["name", "created_at"]).data
@@ -0,0 +1,104 @@
+import re
+
+import pytest
+from rest_framework.test import APIClient
+
+from home.instrumentation import RouteStats, route_stats
+from home.models import App
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_route_stats(settings):
+    settings.PERF_SAMPLE_RATE = 1
+    route_stats.clear()
+
+
+@pytest.fixture
+def staff(user):
+    user.is_staff = True
+    user.save()
+    return user
+
+
+def server_timing(response):
+    return {
+        match.group(1): float(match.group(2))
+        for match in re.finditer(r"(\w+);dur=([\d.]+)", response["Server-Timing"])
+    }
+
+
+def test_server_timing_header(token_client, staff):
+    App.objects.create(name="app", type="Web", framework="Django", user=staff)
+
+    response = token_client.get("/api/v1/apps/")
+
+    timings = server_timing(response)
+    assert set(timings) == {"db", "auth", "serialize", "view", "total"}
+    assert timings["total"] >= timings["view"] >= timings["serialize"]
+    assert re.search(r'db;dur=[\d.]+;desc="\d+ queries"', response["Server-Timing"])
+
+
+def test_queries_are_counted(token_client, staff):
+    app = App.objects.create(name="app", type="Web", framework="Django", user=staff)
+
+    response = token_client.get(f"/api/v1/apps/{app.id}/")
+
+    # token, app row
+    assert 'desc="2 queries"' in response["Server-Timing"]
+
+
+def test_server_timing_is_only_sent_to_staff(token_client, settings):
+    assert not token_client.get("/api/v1/apps/").has_header("Server-Timing")
+    assert not APIClient().get("/api/v1/plans/").has_header("Server-Timing")
+    # Still timed
+    assert route_stats.summary()["GET api/v1/apps/$"]["count"] == 1
+
+    settings.DEBUG = True
+
+    assert APIClient().get("/api/v1/plans/").has_header("Server-Timing")
+
+
+def test_requests_are_not_timed_when_not_sampled(settings):
+    settings.PERF_SAMPLE_RATE = 0
+    settings.DEBUG = True
+
+    response = APIClient().get("/api/v1/plans/")
+
+    assert not response.has_header("Server-Timing")
+    assert route_stats.summary() == {}
+
+
+def test_percentiles_per_route(token_client, user):
+    app = App.objects.create(name="app", type="Web", framework="Django", user=user)
+    for _ in range(3):
+        token_client.get("/api/v1/apps/")
+    token_client.get(f"/api/v1/apps/{app.id}/")
+
+    summary = route_stats.summary()
+
+    assert summary["GET api/v1/apps/$"]["count"] == 3
+    assert summary["GET api/v1/apps/(?P<pk>[^/.]+)/$"]["count"] == 1
+    assert set(summary["GET api/v1/apps/$"]["total_ms"]) == {"p50", "p95", "p99"}
+
+
+def test_rolling_window_keeps_the_latest_samples():
+    stats = RouteStats(window=100)
+    for i in range(200):
+        stats.record("GET /", i / 1000, 0, 1)
+
+    summary = stats.summary()["GET /"]
+
+    assert summary["count"] == 100
+    assert summary["total_ms"]["p50"] == pytest.approx(150)
+    assert summary["total_ms"]["p99"] == pytest.approx(199)
+
+
+def test_stats_endpoint_is_staff_only(token_client, user):
+    assert token_client.get("/api/v1/perf-stats/").status_code == 403
+
+    user.is_staff = True
+    user.save()
+
+    assert "GET api/v1/perf-stats/$" in token_client.get("/api/v1/perf-stats/").data
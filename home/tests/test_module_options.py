@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+import types
+
+import pytest
+
+from modules.utils import OptionsStore
+
+
+@pytest.fixture
+def options_file(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "modules.demo.options", types.SimpleNamespace(color="red", size="large"))
+    path = tmp_path / "options.json"
+    path.write_text(json.dumps({"module_options": [{"slug": "demo", "color": "blue"}, {"slug": "demo", "color": "green"}]}))
+    return path
+
+
+def test_file_options_override_the_module_defaults(options_file):
+    store = OptionsStore(str(options_file))
+
+    assert store.get("demo", "color") == "blue"
+    assert store.get("demo", "size") is None
+
+
+def test_file_is_parsed_once(options_file, monkeypatch):
+    store = OptionsStore(str(options_file))
+    store.get("demo", "color")
+    monkeypatch.setattr(store, "_load", lambda path: pytest.fail("options.json parsed again"))
+
+    assert store.get("demo", "color") == "blue"
+
+
+def test_edited_file_is_reloaded(options_file):
+    store = OptionsStore(str(options_file))
+    store.get("demo", "color")
+
+    options_file.write_text(json.dumps({"module_options": [{"slug": "demo", "color": "purple"}]}))
+
+    assert store.get("demo", "color") == "purple"
+
+
+def test_replaced_file_is_reloaded(options_file, tmp_path):
+    store = OptionsStore(str(options_file))
+    store.get("demo", "color")
+    stat = os.stat(options_file)
+
+    # Same size and mtime, only the inode tells the files apart
+    replacement = tmp_path / "replacement.json"
+    replacement.write_text(json.dumps({"module_options": []}).ljust(stat.st_size))
+    os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(replacement, options_file)
+
+    assert store.get("demo", "color") == "red"
+
+
+def test_defaults_are_looked_up_once(options_file, monkeypatch):
+    store = OptionsStore(str(options_file))
+    monkeypatch.setitem(sys.modules, "modules.other.options", types.SimpleNamespace(color="red"))
+    assert store.get("other", "color") == "red"
+
+    monkeypatch.setitem(sys.modules, "modules.other.options", types.SimpleNamespace(color="changed"))
+
+    assert store.get("other", "color") == "red"
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from modules import manifest
+
+
+@pytest.fixture
+def modules_dir(tmp_path):
+    root = tmp_path / "modules"
+    for name in ("apps.py", "urls.py", "admin.py"):
+        (root / "chat").mkdir(parents=True, exist_ok=True)
+        (root / "chat" / name).touch()
+    (root / "apps.py").touch()
+    (root / "social_auth" / "migrations").mkdir(parents=True)
+    (root / "social_auth" / "apps.py").touch()
+    (root / "social_auth" / "urls.py").touch()
+    (root / "social_auth" / "migrations" / "apps.py").touch()
+    return root
+
+
+def load(modules_dir):
+    return manifest.load_registry(str(modules_dir), str(modules_dir.parent / "registry.json"))
+
+
+def test_scan_finds_apps_urls_and_admins(modules_dir):
+    registry = manifest.scan(str(modules_dir))
+
+    assert registry["apps"] == ["modules", "modules.chat", "modules.social_auth"]
+    assert registry["urls"] == ["chat", "social_auth"]
+    assert registry["admins"] == ["chat"]
+    assert set(registry["directories"]) == {".", "chat", "social_auth"}
+
+
+def test_fresh_registry_is_read_without_walking(modules_dir, monkeypatch):
+    registry = load(modules_dir)
+
+    def walk(*args, **kwargs):
+        raise AssertionError("modules/ walked")
+
+    monkeypatch.setattr(os, "walk", walk)
+    assert load(modules_dir) == registry
+
+
+def test_new_module_makes_the_registry_stale(modules_dir):
+    load(modules_dir)
+    (modules_dir / "payments").mkdir()
+    (modules_dir / "payments" / "apps.py").touch()
+
+    assert "modules.payments" in load(modules_dir)["apps"]
+
+
+def test_removed_file_makes_the_registry_stale(modules_dir):
+    load(modules_dir)
+    os.remove(modules_dir / "chat" / "admin.py")
+
+    assert load(modules_dir)["admins"] == []
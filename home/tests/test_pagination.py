@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from home.models import App
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def apps(user):
+    apps = [App.objects.create(name=f"app {i}", type="Web", framework="Django", user=user) for i in range(5)]
+    # Rows sharing a timestamp must still page deterministically by id
+    App.objects.filter(id__in=[app.id for app in apps]).update(created_at=timezone.now())
+    return apps
+
+
+def test_pages_forward_and_back(api_client, apps):
+    first = api_client.get("/api/v1/apps/", {"page_size": 2}).json()
+    second = api_client.get(first["next"]).json()
+    third = api_client.get(second["next"]).json()
+
+    assert [app["id"] for app in first["results"]] == [apps[0].id, apps[1].id]
+    assert [app["id"] for app in second["results"]] == [apps[2].id, apps[3].id]
+    assert [app["id"] for app in third["results"]] == [apps[4].id]
+    assert first["previous"] is None
+    assert third["next"] is None
+
+    back = api_client.get(third["previous"]).json()
+    assert [app["id"] for app in back["results"]] == [apps[2].id, apps[3].id]
+
+
+def test_deep_page_uses_range_query(api_client, apps):
+    first = api_client.get("/api/v1/apps/", {"page_size": 4}).json()
+
+    with CaptureQueriesContext(connection) as queries:
+        api_client.get(first["next"])
+
+    pages = [query["sql"] for query in queries if "ORDER BY" in query["sql"]]
+    assert len(pages) == 1
+    assert "OFFSET" not in pages[0].upper()
+
+
+def test_only_owned_apps_are_listed(api_client, apps):
+    App.objects.create(name="other", type="Web", framework="Django")
+
+    response = api_client.get("/api/v1/apps/")
+
+    assert len(response.json()["results"]) == len(apps)
+
+
+def test_invalid_cursor(api_client):
+    response = api_client.get("/api/v1/apps/", {"cursor": "not-a-cursor"})
+
+    assert response.status_code == 404
@@ -0,0 +1,109 @@
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from home import screenshots
+from home.models import App
+from users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def app(user):
+    return App.objects.create(name="app", type="Web", framework="Django", user=user)
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    futures = []
+    schedule = screenshots.schedule_thumbnails
+    monkeypatch.setattr(screenshots, "schedule_thumbnails", lambda name: futures.append(schedule(name)))
+    return futures
+
+
+def png(color="red", size=(1000, 800)):
+    content = io.BytesIO()
+    Image.new("RGB", size, color).save(content, format="PNG")
+    content.name = "screenshot.png"
+    content.seek(0)
+    return content
+
+
+def upload(api_client, app, content):
+    return api_client.put(f"/api/v1/apps/{app.id}/screenshot/", {"screenshot": content}, format="multipart")
+
+
+def test_upload_stores_content_addressed_screenshot(api_client, app, scheduled):
+    response = upload(api_client, app, png())
+
+    assert response.status_code == 200
+    app.refresh_from_db()
+    name = app.screenshot
+    assert name.startswith("screenshots/") and name.endswith(".png")
+    assert default_storage.exists(name)
+    assert response.json()["screenshot"] == {
+        "url": default_storage.url(name),
+        "thumbnails": {
+            f"{width}x{height}": default_storage.url(screenshots.thumbnail_name(name, (width, height)))
+            for width, height in [(128, 128), (320, 320), (640, 640)]
+        },
+    }
+
+    created = [future.result(timeout=10) for future in scheduled][0]
+    assert created == [screenshots.thumbnail_name(name, size) for size in [(128, 128), (320, 320), (640, 640)]]
+    with default_storage.open(created[0]) as thumbnail, Image.open(thumbnail) as image:
+        assert image.size == (128, 102)
+
+
+def test_reupload_is_a_noop(api_client, app, scheduled):
+    first = upload(api_client, app, png()).json()["screenshot"]["url"]
+    [future.result(timeout=10) for future in scheduled]
+    files = default_storage.listdir("screenshots")[1]
+
+    second = upload(api_client, app, png()).json()["screenshot"]["url"]
+
+    assert second == first
+    assert scheduled[-1].result(timeout=10) == []
+    assert default_storage.listdir("screenshots")[1] == files
+
+
+def test_rejects_non_images(api_client, app, scheduled):
+    content = io.BytesIO(b"not an image")
+    content.name = "screenshot.png"
+
+    response = upload(api_client, app, content)
+
+    assert response.status_code == 400
+    assert scheduled == []
+
+
+def test_rejects_large_uploads(api_client, app, scheduled, settings):
+    settings.SCREENSHOT_MAX_UPLOAD_SIZE = 100
+
+    response = upload(api_client, app, png())
+
+    assert response.status_code == 400
+    assert "larger" in response.json()["message"]
+
+
+def test_only_owner_can_upload(api_client, scheduled):
+    other = App.objects.create(name="other", type="Web", framework="Django", user=UserFactory())
+
+    assert upload(api_client, other, png()).status_code == 403
+
+
+def test_apps_without_an_upload_have_no_screenshot(api_client, user):
+    response = api_client.post("/api/v1/apps/", {"name": "app", "type": "Web", "framework": "Django"}, format="json")
+
+    assert response.status_code == 201
+    assert response.json()["screenshot"] is None
+    assert App.objects.get().screenshot is None
+
+
+def test_list_returns_the_uploaded_screenshot(api_client, app, scheduled):
+    uploaded = upload(api_client, app, png()).json()["screenshot"]
+
+    assert api_client.get("/api/v1/apps/").json()["results"][0]["screenshot"] == uploaded
@@ -0,0 +1,87 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from backend_app_32996 import secret_manager
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+
+    def fetch_payload(settings_name, timeout):
+        calls.append(settings_name)
+        return f"SECRET_KEY=fetched-{len(calls)}\n"
+
+    monkeypatch.setattr(secret_manager, "credentials_available", lambda: True)
+    monkeypatch.setattr(secret_manager, "fetch_payload", fetch_payload)
+    return calls
+
+
+KEY = b"1" * 43 + b"="
+
+
+def load(path, ttl=60, key=KEY):
+    return secret_manager.load_payload("django_settings", cache_file=path and str(path), ttl=ttl, timeout=1, key=key)
+
+
+def test_payload_is_fetched_once_and_cached_encrypted(fetches, tmp_path):
+    path = tmp_path / "settings.secrets"
+
+    assert load(path) == "SECRET_KEY=fetched-1\n"
+    assert load(path) == "SECRET_KEY=fetched-1\n"
+
+    assert fetches == ["django_settings"]
+    assert b"fetched" not in path.read_bytes()
+
+
+def test_stale_cache_is_used_and_refreshed_in_background(fetches, tmp_path):
+    path = tmp_path / "settings.secrets"
+    load(path)
+
+    assert load(path, ttl=-1) == "SECRET_KEY=fetched-1\n"
+
+    deadline = time.monotonic() + 2
+    while load(path) != "SECRET_KEY=fetched-2\n" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert load(path) == "SECRET_KEY=fetched-2\n"
+
+
+def test_unreadable_cache_is_fetched_again(fetches, tmp_path):
+    path = tmp_path / "settings.secrets"
+    load(path)
+
+    secret_manager.SecretCache(str(path), key=b"0" * 43 + b"=").write("SECRET_KEY=other\n")
+
+    assert load(path) == "SECRET_KEY=fetched-2\n"
+
+
+@pytest.mark.parametrize("path, key", [("settings.secrets", None), (None, KEY)])
+def test_cache_is_off_without_path_and_key(fetches, tmp_path, path, key):
+    path = path and tmp_path / path
+
+    assert load(path, key=key) == "SECRET_KEY=fetched-1\n"
+    assert load(path, key=key) == "SECRET_KEY=fetched-2\n"
+    assert not list(tmp_path.iterdir())
+
+
+def test_failed_fetch_is_not_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(secret_manager, "credentials_available", lambda: True)
+    monkeypatch.setattr(secret_manager, "fetch_payload", lambda settings_name, timeout: None)
+    path = tmp_path / "settings.secrets"
+
+    assert load(path) is None
+    assert not path.exists()
+
+
+def test_no_credentials_imports_nothing(tmp_path):
+    code = (
+        "import sys\n"
+        "from backend_app_32996 import secret_manager\n"
+        "secret_manager.credentials_available = lambda: False\n"
+        f"assert secret_manager.load_payload('x', {str(tmp_path / 'x')!r}, 60, 1, b'1' * 43 + b'=') is None\n"
+        "assert not [name for name in sys.modules if name.startswith(('google', 'cryptography'))]\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
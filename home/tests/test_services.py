@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from home.models import App, Plan, Subscription
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def plan():
+    return Plan.objects.create(id=1, name="Free", description="Free plan", price="$0")
+
+
+@pytest.fixture
+def app(user):
+    return App.objects.create(name="app", type="Web", framework="Django", user=user)
+
+
+def test_activation_replaces_active_subscription(user, plan, app):
+    first = Subscription.objects.create(user=user, plan=plan, app=app, active=True)
+    second = Subscription.objects.create(user=user, plan=plan, app=app, active=True)
+
+    first.refresh_from_db()
+    app.refresh_from_db()
+    assert not first.active
+    assert app.subscription_id == second.id
+
+
+def test_activation_only_updates_app_subscription(user, plan, app):
+    with CaptureQueriesContext(connection) as queries:
+        Subscription.objects.create(user=user, plan=plan, app=app, active=True)
+
+    app_updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "home_app"')]
+    assert len(app_updates) == 1
+    assert '"name"' not in app_updates[0]
+    assert '"description"' not in app_updates[0]
+
+
+def test_database_rejects_second_active_subscription(user, plan, app):
+    Subscription.objects.create(user=user, plan=plan, app=app, active=True)
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Subscription.objects.bulk_create([Subscription(user=user, plan=plan, app=app, active=True)])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_activations_leave_one_active_subscription(user, plan, app):
+    errors = []
+    barrier = threading.Barrier(8)
+
+    def activate():
+        try:
+            barrier.wait()
+            for _ in range(5):
+                # SQLite has no row locks and reports contention instead of
+                # waiting, so retry there, PostgreSQL blocks on the app row
+                while True:
+                    try:
+                        Subscription.objects.create(user=user, plan=plan, app=app, active=True)
+                        break
+                    except OperationalError:
+                        time.sleep(0.01)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=activate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert Subscription.objects.filter(app=app).count() == 40
+    active = Subscription.objects.get(app=app, active=True)
+    app.refresh_from_db()
+    assert app.subscription_id == active.id
@@ -0,0 +1,51 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from home.models import App, Plan, Subscription
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def app(user):
+    return App.objects.create(
+        name="app", type="Web", framework="Django", description="x" * 10000, screenshot="app.png", user=user
+    )
+
+
+def test_app_list_reads_only_requested_columns(api_client, app):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/v1/apps/", {"fields": "id,name,type"})
+
+    assert response.json()["results"] == [{"id": app.id, "name": "app", "type": "Web"}]
+    page = [query["sql"] for query in queries if "ORDER BY" in query["sql"]][0]
+    assert '"description"' not in page
+    assert '"screenshot"' not in page
+
+
+def test_app_detail_fields(api_client, app):
+    response = api_client.get(f"/api/v1/apps/{app.id}/", {"fields": "name,description"})
+
+    assert response.json() == {"name": "app", "description": app.description}
+
+
+def test_unknown_field(api_client, app):
+    response = api_client.get("/api/v1/apps/", {"fields": "id,owner"})
+
+    assert response.status_code == 400
+    assert "fields" in response.json()
+
+
+def test_subscription_fields_with_expand(api_client, user, app):
+    plan = Plan.objects.create(id=1, name="Free", description="Free plan", price="$0")
+    Subscription.objects.create(user=user, plan=plan, app=app, active=True)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/v1/subscriptions/", {"fields": "id,app", "expand": "app,plan"})
+
+    result = response.json()["results"][0]
+    assert set(result) == {"id", "app"}
+    assert result["app"]["name"] == "app"
+    page = [query["sql"] for query in queries if "ORDER BY" in query["sql"]][0]
+    assert '"home_subscription"."plan_id"' not in page
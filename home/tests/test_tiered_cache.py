@@ -0,0 +1,156 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from home import tiered_cache
+from home.catalog import plan_catalog
+from home.models import Plan
+from home.tiered_cache import InvalidationBus, LocalTier, RedisInvalidationBus, SocketInvalidationBus, TwoTierCache
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def make_cache():
+    names = []
+
+    def make(name, bus=None, **kwargs):
+        kwargs = dict({"max_size": 10, "local_ttl": 60, "shared_ttl": 60}, **kwargs)
+        names.append(name)
+        return TwoTierCache(name, bus=bus or InvalidationBus(), **kwargs)
+
+    yield make
+    for name in names:
+        tiered_cache.registry.pop(name, None)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_local_tier_evicts_least_recently_used():
+    tier = LocalTier(max_size=2, ttl=60)
+    tier.set("a", 1, 0)
+    tier.set("b", 2, 0)
+    tier.get("a")
+    tier.set("c", 3, 0)
+
+    assert tier.get("a") == (1, 0)
+    assert tier.get("b") is tiered_cache.MISSING
+    assert tier.get("c") == (3, 0)
+
+
+def test_local_tier_expires_entries():
+    tier = LocalTier(max_size=2, ttl=0)
+    tier.set("a", 1, 0)
+
+    assert tier.get("a") is tiered_cache.MISSING
+    assert len(tier) == 0
+
+
+def test_reads_fall_through_the_tiers(make_cache):
+    cache = make_cache("demo")
+    loads = []
+
+    assert cache.get_or_set("key", lambda: loads.append(1) or "value") == "value"
+    assert cache.get("key") == "value"
+    cache.clear_local()
+    assert cache.get("key") == "value"
+    assert cache.get("key") == "value"
+
+    assert len(loads) == 1
+    stats = cache.stats()
+    assert (stats["local"]["hits"], stats["local"]["misses"]) == (2, 2)
+    assert (stats["shared"]["hits"], stats["shared"]["misses"]) == (1, 1)
+    assert stats["local"]["max_age"] >= 0
+
+
+def test_delete_clears_both_tiers(make_cache):
+    cache = make_cache("demo")
+    cache.set("key", "value")
+
+    cache.delete("key")
+
+    assert cache.get("key") is None
+    assert cache.stats()["shared"]["misses"] == 1
+
+
+def test_invalidations_reach_the_other_processes(make_cache, tmp_path):
+    # Two workers sharing the Redis tier, each with its own memory and socket
+    first_bus, second_bus = SocketInvalidationBus(str(tmp_path)), SocketInvalidationBus(str(tmp_path))
+    first = make_cache("demo", bus=first_bus)
+    first_bus.registry = {"demo": first}
+    second = make_cache("demo", bus=second_bus)
+    second_bus.registry = {"demo": second}
+    try:
+        first.set("key", "old")
+        assert second.get("key") == "old"
+
+        first.set("key", "new")
+        first.delete("other")
+        assert second.get("key") == "old"
+
+        first.delete("key")
+        assert wait_for(lambda: second.stats()["local"]["invalidations"] == 2)
+        assert second.get("key") is None
+        assert second.stats()["local"]["max_invalidation_lag"] < 2
+        assert first.stats()["local"]["invalidations"] == 0
+    finally:
+        first_bus.close()
+        second_bus.close()
+
+
+def test_socket_bus_removes_stale_sockets(tmp_path):
+    bus = SocketInvalidationBus(str(tmp_path))
+    bus.start()
+    gone = tmp_path / "gone.sock"
+    gone.touch()
+    try:
+        bus.publish("demo", ["key"])
+    finally:
+        bus.close()
+
+    assert not gone.exists()
+
+
+def test_unreachable_bus_skips_the_local_tier(make_cache):
+    bus = RedisInvalidationBus("redis://127.0.0.1:1")
+    cache = make_cache("demo", bus=bus)
+
+    cache.set("key", 1)
+
+    assert cache.get("key") == 1
+    assert len(cache.local) == 0
+    assert cache.stats()["shared"]["hits"] == 1
+    # Not retried before the backoff is over
+    assert bus._retry_at > time.monotonic()
+    assert bus.start() is False
+
+
+def test_requests_are_served_while_the_bus_is_down(token_client, monkeypatch):
+    monkeypatch.setattr(tiered_cache, "_bus", RedisInvalidationBus("redis://127.0.0.1:1"))
+    Plan.objects.create(id=1, name="Free", description="Free plan", price="$0")
+
+    for _ in range(2):
+        response = token_client.get("/api/v1/plans/")
+        assert response.status_code == 200
+        assert [plan["name"] for plan in response.json()] == ["Free"]
+
+
+def test_plan_catalog_is_read_from_memory():
+    Plan.objects.create(id=1, name="Free", description="Free plan", price="$0")
+    plan_catalog.list()
+
+    with CaptureQueriesContext(connection) as queries:
+        plan_catalog.payload(1)
+
+    assert len(queries) == 0
+    assert tiered_cache.registry["plans"].stats()["local"]["hits"] == 1
+
@@ -0,0 +1,49 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from home import usernames
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def signup(name, email):
+    return APIClient().post("/api/v1/signup//", {"name": name, "email": email, "password": "s3cret-pass"}, format="json")
+
+
+def test_signups_with_the_same_name_get_unique_usernames():
+    assert signup("John Smith", "john@example.com").status_code == 201
+    assert signup("John Smith", "smith@example.com").status_code == 201
+
+    first, second = User.objects.order_by("id").values_list("username", flat=True)
+    assert first == "john_smith"
+    assert second.startswith("john_smith") and second != first
+
+
+def test_candidates_are_checked_in_one_query():
+    User.objects.create(username="john_smith")
+    user = User(email="john@example.com")
+
+    with CaptureQueriesContext(connection) as queries:
+        usernames.save_with_unique_username(user, ["John Smith"])
+
+    lookups = [query["sql"] for query in queries if query["sql"].startswith("SELECT")]
+    assert len(lookups) == 1
+    assert user.username.startswith("john_smith") and user.username != "john_smith"
+
+
+def test_username_taken_by_a_concurrent_signup_is_retried(monkeypatch):
+    User.objects.create(username="john_smith")
+    pick_username = usernames.pick_username
+    # The first lookup ran before the concurrent signup committed
+    picks = iter(["john_smith"])
+    monkeypatch.setattr(usernames, "pick_username", lambda txts, exclude: next(picks, None) or pick_username(txts, exclude))
+
+    user = usernames.save_with_unique_username(User(email="john@example.com"), ["John Smith"])
+
+    assert user.pk is not None
+    assert user.username != "john_smith"
@@ -0,0 +1,470 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import caches
+
+from backend_app_32996.db.router import max_lag, may_be_stale
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+# Shared entry written by `evict()`, a `fill()` can't store over it until it expires
+TOMBSTONE = "tiered-cache:evicted"
+
+# name -> TwoTierCache, used to route the invalidation messages
+registry = {}
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+class TierStats:
+    """
+    Hit/miss counters of one tier plus the age of the values it served, i.e.
+    how long ago they were loaded from the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+            self.age_total = self.age_max = 0.0
+            self.invalidations = 0
+            self.lag_total = self.lag_max = 0.0
+
+    def hit(self, stored_at):
+        age = max(time.time() - stored_at, 0.0)
+        with self._lock:
+            self.hits += 1
+            self.age_total += age
+            self.age_max = max(self.age_max, age)
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def invalidated(self, sent_at):
+        lag = max(time.time() - sent_at, 0.0)
+        with self._lock:
+            self.invalidations += 1
+            self.lag_total += lag
+            self.lag_max = max(self.lag_max, lag)
+
+    def as_dict(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "mean_age": self.age_total / self.hits if self.hits else None,
+                "max_age": self.age_max,
+                "invalidations": self.invalidations,
+                "mean_invalidation_lag": self.lag_total / self.invalidations if self.invalidations else None,
+                "max_invalidation_lag": self.lag_max,
+            }
+
+
+class LocalTier:
+    """Bounded LRU map of key -> (value, stored_at) with a TTL, private to the process."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, stored_at, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value, stored_at
+
+    def set(self, key, value, stored_at):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, stored_at, time.monotonic() + self.ttl)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TwoTierCache:
+    """
+    A `LocalTier` in front of the shared Django cache (Redis in production).
+
+    Reads are served from process memory when possible and fall back to the
+    shared cache, then to the caller's loader. `delete()` removes the keys from
+    both tiers and broadcasts them on the invalidation bus so the other worker
+    processes drop their local copies too. The local TTL bounds staleness if a
+    broadcast is lost.
+
+    `delete()` can lose to a concurrent load that read the rows before they
+    changed and stores them after the delete. Where that matters, values are
+    stored with `fill()` and removed with `evict()`, which leaves a tombstone
+    that fills don't overwrite.
+    """
+
+    def __init__(self, name, max_size, local_ttl, shared_ttl, alias="default", bus=None):
+        self.name = name
+        self.local = LocalTier(max_size, local_ttl)
+        self.shared_ttl = shared_ttl
+        self.alias = alias
+        self._bus = bus
+        self.local_stats = TierStats()
+        self.shared_stats = TierStats()
+        registry[name] = self
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @property
+    def bus(self):
+        return self._bus or invalidation_bus()
+
+    def get(self, key, default=None):
+        # Local entries may have missed invalidations while the bus was down
+        if self.bus.start():
+            entry = self.local.get(key)
+            if entry is not MISSING:
+                self.local_stats.hit(entry[1])
+                return entry[0]
+            self.local_stats.miss()
+        entry = self.shared.get(self._shared_key(key))
+        if entry is None or entry == TOMBSTONE:
+            self.shared_stats.miss()
+            return default
+        self.shared_stats.hit(entry[1])
+        self._set_local(key, *entry)
+        return entry[0]
+
+    def get_or_set(self, key, loader):
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = loader()
+            # Every worker would use it until it expires, long after the replica caught up
+            if not may_be_stale(self.shared.get(self._changed_key(key))):
+                self.set(key, value)
+        return value
+
+    def set(self, key, value):
+        stored_at = time.time()
+        self.shared.set(self._shared_key(key), (value, stored_at), self.shared_ttl)
+        self._set_local(key, value, stored_at)
+
+    def fill(self, key, value):
+        """
+        Store `value`, loaded before the call, unless `key` was evicted since or
+        another fill stored it first. Returns whether it was stored.
+        """
+        stored_at = time.time()
+        entry = (value, stored_at)
+        shared_key = self._shared_key(key)
+        if not self.shared.add(shared_key, entry, self.shared_ttl):
+            return False
+        self._set_local(key, value, stored_at)
+        if self.shared.get(shared_key) != entry:
+            # Evicted between the add and the local copy
+            self.local.delete([key])
+            return False
+        return True
+
+    def evict(self, *keys, ttl):
+        """`delete()` that also keeps `fill()` from storing the keys for `ttl` seconds."""
+        if not keys:
+            return
+        self.shared.set_many({self._shared_key(key): TOMBSTONE for key in keys}, ttl)
+        self.local.delete(keys)
+        self.bus.publish(self.name, keys)
+
+    def delete(self, *keys):
+        if not keys:
+            return
+        self.shared.delete_many([self._shared_key(key) for key in keys])
+        # Read by get_or_set(), outlives the window in which a replica may lag
+        self.shared.set_many({self._changed_key(key): time.time() for key in keys}, math.ceil(max_lag()) + 1)
+        self.local.delete(keys)
+        self.bus.publish(self.name, keys)
+
+    def evict_local(self, keys, sent_at):
+        # Called by the bus for invalidations published by other processes
+        self.local.delete(keys)
+        self.local_stats.invalidated(sent_at)
+
+    def clear_local(self):
+        self.local.clear()
+
+    def stats(self):
+        local = self.local_stats.as_dict()
+        local["size"] = len(self.local)
+        shared = self.shared_stats.as_dict()
+        # Shared entries are only removed by delete() or expiry, no broadcast
+        del shared["invalidations"], shared["mean_invalidation_lag"], shared["max_invalidation_lag"]
+        return {"local": local, "shared": shared}
+
+    def reset_stats(self):
+        self.local_stats.reset()
+        self.shared_stats.reset()
+
+    def _set_local(self, key, value, stored_at):
+        # Subscribe before holding anything locally, or invalidations published
+        # in between would be missed. Only the shared tier is used while the
+        # bus can't be reached.
+        if self.bus.start():
+            self.local.set(key, value, stored_at)
+
+    def _shared_key(self, key):
+        return f"tiered:{self.name}:{hashlib.md5(str(key).encode()).hexdigest()}"
+
+    def _changed_key(self, key):
+        return self._shared_key(key) + ":changed"
+
+
+class InvalidationBus:
+    """
+    Single process bus, invalidations only reach the caches of this process,
+    which `TwoTierCache.delete()` already evicted. Subclasses broadcast them to
+    the other processes and feed the ones they receive to `receive()`.
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self.registry = registry
+
+    def start(self):
+        """Start receiving the invalidations of the other processes, returns whether they are."""
+        return True
+
+    def publish(self, name, keys):
+        pass
+
+    def close(self):
+        pass
+
+    def encode(self, name, keys):
+        return json.dumps({"origin": self.origin, "cache": name, "keys": list(keys), "sent_at": time.time()}).encode()
+
+    def receive(self, data):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            logger.warning("Ignoring malformed cache invalidation message")
+            return
+        if message.get("origin") == self.origin:
+            return
+        cache = self.registry.get(message.get("cache"))
+        if cache is not None:
+            cache.evict_local(message["keys"], message["sent_at"])
+
+    def clear_local_caches(self):
+        for cache in list(self.registry.values()):
+            cache.clear_local()
+
+
+class ListenerBus(InvalidationBus):
+    """
+    Bus receiving the messages of the other processes on a daemon thread.
+
+    While it can't connect, `start()` returns False and the caches only use
+    their shared tier. Connecting is retried with an exponential backoff, by
+    `start()` until the first connection and by the listener thread after it.
+    """
+    max_backoff = 30
+
+    def __init__(self):
+        super().__init__()
+        self._thread = None
+        self._started = threading.Lock()
+        self._closed = threading.Event()
+        self._connected = threading.Event()
+        self._backoff = 0
+        self._retry_at = 0
+
+    def start(self):
+        if self._connected.is_set():
+            return True
+        if self._thread is not None or time.monotonic() < self._retry_at:
+            return False
+        with self._started:
+            if self._thread is None and time.monotonic() >= self._retry_at:
+                if not self._try_connect():
+                    self._retry_at = time.monotonic() + self._backoff
+                    return False
+                self._thread = threading.Thread(target=self.listen, name="cache-invalidation", daemon=True)
+                self._thread.start()
+        return self._connected.is_set()
+
+    def close(self):
+        self._closed.set()
+
+    def reconnect(self):
+        """Called by the listener thread when the connection is lost."""
+        # Whatever was published while disconnected is lost
+        self._connected.clear()
+        self.clear_local_caches()
+        while not self._closed.wait(self._backoff):
+            if self._try_connect():
+                # Stored by requests that checked the bus just before it went down
+                self.clear_local_caches()
+                return
+
+    def _try_connect(self):
+        try:
+            self.connect()
+        except Exception:
+            self._backoff = min(max(self._backoff * 2, 1), self.max_backoff)
+            logger.exception("Could not connect to the cache invalidation channel, retrying in %ss", self._backoff)
+            return False
+        self._backoff = 0
+        self._connected.set()
+        return True
+
+    def connect(self):
+        raise NotImplementedError
+
+    def listen(self):
+        raise NotImplementedError
+
+
+class RedisInvalidationBus(ListenerBus):
+    """Broadcasts invalidations over a Redis pub/sub channel."""
+
+    def __init__(self, url, channel="tiered-cache-invalidation"):
+        super().__init__()
+        import redis
+
+        self.channel = channel
+        self.client = redis.Redis.from_url(url)
+        self.pubsub = None
+
+    def connect(self):
+        if self.pubsub is not None:
+            self.pubsub.close()
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(self.channel)
+
+    def publish(self, name, keys):
+        try:
+            self.client.publish(self.channel, self.encode(name, keys))
+        except Exception:
+            logger.exception("Could not publish cache invalidation of %s", name)
+
+    def listen(self):
+        import redis
+
+        while not self._closed.is_set():
+            try:
+                message = self.pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    self.receive(message["data"])
+            except redis.RedisError:
+                logger.exception("Cache invalidation channel lost, clearing the local caches")
+                self.reconnect()
+        self.pubsub.close()
+
+
+class SocketInvalidationBus(ListenerBus):
+    """
+    Broadcasts invalidations between the processes of one host through Unix
+    datagram sockets in a shared directory, a stand-in for Redis pub/sub in
+    tests and single host deployments.
+    """
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{self.origin[:16]}.sock")
+        self.sock = None
+
+    def connect(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+        self.sock.settimeout(1.0)
+
+    def publish(self, name, keys):
+        data = self.encode(name, keys)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            for entry in os.listdir(self.directory):
+                path = os.path.join(self.directory, entry)
+                if not entry.endswith(".sock") or path == self.path:
+                    continue
+                try:
+                    sender.sendto(data, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Left behind by a process that is gone
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+
+    def listen(self):
+        while not self._closed.is_set():
+            try:
+                self.receive(self.sock.recv(65536))
+            except socket.timeout:
+                continue
+        self.sock.close()
+
+    def close(self):
+        super().close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def bus_from_url(url):
+    """InvalidationBus for a redis:// or unix:///<directory> url, a local one when empty."""
+    if not url:
+        return InvalidationBus()
+    parsed = urlparse(url)
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisInvalidationBus(url)
+    if parsed.scheme == "unix":
+        return SocketInvalidationBus(parsed.path)
+    raise ValueError(f"Unsupported cache invalidation url {url!r}")
+
+
+def invalidation_bus():
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = bus_from_url(getattr(settings, "CACHE_INVALIDATION_URL", ""))
+    return _bus
+
+
+def stats():
+    return {name: cache.stats() for name, cache in sorted(registry.items())}
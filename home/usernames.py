@@ -0,0 +1,52 @@
+"""
+Unique usernames for signups, in one query.
+
+allauth's `generate_unique_username` looks its candidates up with an OR of
+`username__iexact` clauses, which the unique index on username can't serve,
+and two concurrent signups can still pick the same free name. Here the
+candidates are looked up with one `username__in` query on that index, and the
+unique constraint decides: a signup that loses the race for a name retries
+with new candidates.
+"""
+from allauth.account.adapter import get_adapter
+from allauth.utils import _generate_unique_username_base, generate_username_candidates
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+# Rounds of candidates tried before giving up, each round is one query and one insert
+MAX_ATTEMPTS = 5
+
+
+def pick_username(txts, exclude=()):
+    """First candidate generated from `txts` that no user has, None if all of them are taken."""
+    adapter = get_adapter()
+    candidates = [name for name in generate_username_candidates(_generate_unique_username_base(txts)) if name not in exclude]
+    taken = set(get_user_model()._default_manager.filter(username__in=candidates).values_list("username", flat=True))
+    for name in candidates:
+        if name in taken:
+            continue
+        try:
+            return adapter.clean_username(name, shallow=True)
+        except ValidationError:
+            pass
+    return None
+
+
+def save_with_unique_username(user, txts):
+    """Insert the new `user` under a free username generated from `txts`."""
+    tried = set()
+    for _ in range(MAX_ATTEMPTS):
+        user.username = pick_username(txts, tried)
+        if user.username is None:
+            continue
+        try:
+            with transaction.atomic():
+                user.save()
+            return user
+        except IntegrityError:
+            # Taken by a concurrent signup since the lookup, unless another constraint failed
+            if not get_user_model()._default_manager.filter(username=user.username).exists():
+                raise
+            tried.add(user.username)
+    raise IntegrityError(f"No free username found in {MAX_ATTEMPTS} attempts")
@@ -1,19 +1,100 @@
+import json
+import logging
+import os
 from pathlib import Path
-from django.urls import path, include
+
+logger = logging.getLogger(__name__)
 
 MODULES_PACKAGE_NAME = "modules"
-MODULES_DIR = f"{Path.cwd()}/{MODULES_PACKAGE_NAME}/"
-APPS = Path(MODULES_DIR).rglob("apps.py")
+MODULES_DIR = f"{Path(__file__).resolve().parent}/"
+# Generated by the rebuild_module_registry command, or on the first boot after
+# a module is added or removed. Kept outside modules/ so that writing it does
+# not change the mtimes it records.
+REGISTRY_FILE = f"{Path(MODULES_DIR).parent}/.modules_registry.json"
+REGISTRY_VERSION = 1
+# Never hold modules, and their mtimes change on every compile/new migration
+SKIPPED_DIRS = {"__pycache__", "migrations"}
 
+_registry = None
 
-def get_modules():
+
+def scan(modules_dir=MODULES_DIR):
+    """
+    Walk the modules tree once and collect the modules providing an apps.py,
+    urls.py or admin.py, with the mtime of every directory visited.
+    """
+    registry = {"version": REGISTRY_VERSION, "directories": {}, "apps": [], "urls": [], "admins": []}
+    for directory, dirnames, filenames in os.walk(modules_dir):
+        dirnames[:] = sorted(name for name in dirnames if name not in SKIPPED_DIRS and not name.startswith("."))
+        relative = Path(directory).relative_to(modules_dir).as_posix()
+        registry["directories"][relative] = os.stat(directory).st_mtime_ns
+        parts = [part for part in relative.split("/") if part != "."]
+        if "apps.py" in filenames:
+            registry["apps"].append(".".join([MODULES_PACKAGE_NAME] + parts))
+        if parts:
+            # urls and admins are included by the name of their own directory
+            if "urls.py" in filenames:
+                registry["urls"].append(parts[-1])
+            if "admin.py" in filenames:
+                registry["admins"].append(parts[-1])
+    return registry
+
+
+def is_fresh(registry, modules_dir=MODULES_DIR):
+    # Adding or removing a file or directory changes the mtime of its parent
+    if registry.get("version") != REGISTRY_VERSION or not registry.get("directories"):
+        return False
+    for relative, mtime in registry["directories"].items():
+        try:
+            if os.stat(os.path.join(modules_dir, relative)).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def read_registry(registry_file=REGISTRY_FILE):
+    try:
+        with open(registry_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_registry(registry, registry_file=REGISTRY_FILE):
+    temporary = f"{registry_file}.{os.getpid()}.tmp"
     try:
-        modules = []
-        python_package_separator = "."
-        for app in APPS:
-            app_name = app.as_posix().replace(MODULES_DIR, f"{MODULES_PACKAGE_NAME}/")
-            app_name = python_package_separator.join(app_name.split("/")[:-1])
-            modules.append(app_name)
-        return modules
-    except (ImportError, IndexError):
-        pass
+        with open(temporary, "w") as f:
+            json.dump(registry, f, indent=2, sort_keys=True)
+        os.replace(temporary, registry_file)
+    except OSError:
+        # A read-only deployment still works, it scans on every boot
+        logger.warning("Could not write the module registry %s", registry_file, exc_info=True)
+
+
+def load_registry(modules_dir=MODULES_DIR, registry_file=REGISTRY_FILE):
+    """The registry file when it is fresh, otherwise a new scan written back to it."""
+    registry = read_registry(registry_file)
+    if registry is not None and is_fresh(registry, modules_dir):
+        return registry
+    registry = scan(modules_dir)
+    write_registry(registry, registry_file)
+    return registry
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        _registry = load_registry()
+    return _registry
+
+
+def rebuild_registry():
+    global _registry
+    _registry = scan()
+    write_registry(_registry)
+    return _registry
+
+
+def get_modules():
+    return list(get_registry()["apps"])
@@ -1,23 +1,71 @@
 import importlib
 import json
+import os
+import threading
 
 from pathlib import Path
 
 GLOBAL_OPTIONS_FILE_PATH = f"{Path.cwd()}/modules/options.json"
 
 
-def get_options(module_slug, option_key):
-    with open(GLOBAL_OPTIONS_FILE_PATH, "r") as f:
-        module_options = json.loads(f.read())
+class OptionsStore:
+    """
+    options.json parsed once into a slug-indexed dict. A lookup costs a stat
+    of the file, it is parsed again only when its inode, mtime or size
+    changed, so a replaced or edited file is picked up by every worker. The
+    defaults of modules.<slug>.options are looked up once per key.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._signature = None
+        self._options = {}
+        self._defaults = {}
+        self._lock = threading.Lock()
+
+    def get(self, module_slug, option_key):
+        module = self.modules().get(module_slug)
+        default_value = self.default(module_slug, option_key)
+        return module.get(option_key) if module is not None else default_value
+
+    def modules(self):
+        path = self.path or GLOBAL_OPTIONS_FILE_PATH
+        stat = os.stat(path)
+        signature = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    self._options = self._load(path)
+                    self._signature = signature
+        return self._options
+
+    def default(self, module_slug, option_key):
+        try:
+            return self._defaults[module_slug, option_key]
+        except KeyError:
+            pass
+        value = getattr(importlib.import_module(f"modules.{module_slug}.options"), option_key)
+        self._defaults[module_slug, option_key] = value
+        return value
 
-    option_value = [
-        module.get(option_key)
-        for module in module_options["module_options"]
-        if module.get("slug") == module_slug
-    ]
+    def clear(self):
+        with self._lock:
+            self._signature = None
+            self._options = {}
+            self._defaults.clear()
 
-    default_value = getattr(
-        importlib.import_module(f"modules.{module_slug}.options"), option_key
-    )
+    def _load(self, path):
+        with open(path, "r") as f:
+            module_options = json.loads(f.read())
 
-    return option_value[0] if option_value else default_value
+        options_by_slug = {}
+        for module in module_options["module_options"]:
+            options_by_slug.setdefault(module.get("slug"), module)
+        return options_by_slug
+
+
+options_store = OptionsStore()
+
+
+def get_options(module_slug, option_key):
+    return options_store.get(module_slug, option_key)